@@ -1,7 +1,30 @@
+import contextlib
+import functools
+import hashlib
 import logging
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from pathlib import Path
 from typing import Optional, Dict, List
 import json
+from collections import Counter, OrderedDict
+from itertools import islice
+
+import numpy as np
+
+from keyword_matcher import KeywordMatcher
+
+# Expandable segments limit CUDA allocator fragmentation between requests of
+# varying size. Must be set before torch initializes CUDA.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True,max_split_size_mb:128")
+
+# Let the Rust tokenizers encode batches on multiple threads; it is otherwise
+# often disabled inside server workers
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
 
 # Hugging Face Transformers
 try:
@@ -11,62 +34,565 @@ try:
 except ImportError:
     print("Transformers not available. Please install: pip install transformers torch")
     pipeline = None
+    torch = None
+
+# ONNX Runtime models via Optimum (optional, enabled with CONTRACTIQ_ONNX=1)
+try:
+    from optimum.onnxruntime import (
+        ORTModelForSeq2SeqLM,
+        ORTModelForQuestionAnswering,
+        ORTModelForSequenceClassification
+    )
+except ImportError:
+    ORTModelForSeq2SeqLM = None
+    ORTModelForQuestionAnswering = None
+    ORTModelForSequenceClassification = None
+
+# Fused attention kernels for PyTorch models (optional)
+try:
+    from optimum.bettertransformer import BetterTransformer
+except ImportError:
+    BetterTransformer = None
+
+# Low-memory model loading and device placement (optional)
+try:
+    import accelerate
+except ImportError:
+    accelerate = None
+
+# 8-bit weights on CUDA (optional, enabled with CONTRACTIQ_LOAD_8BIT=1)
+try:
+    import bitsandbytes
+except ImportError:
+    bitsandbytes = None
+
+# INT8 models produced by quantize_models.py (optional, CPU only)
+try:
+    from neural_compressor.utils.load_huggingface import OptimizedModel
+except ImportError:
+    OptimizedModel = None
+
+# Fast non-cryptographic hashing of documents for cache keys (optional)
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Persistent analysis cache shared across restarts and workers (optional)
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
 
 logger = logging.getLogger(__name__)
 
+# Hugging Face model used for each pipeline task
+MODEL_NAMES = {
+    "summarization": "sshleifer/distilbart-cnn-12-6",
+    "question-answering": "distilbert-base-cased-distilled-squad",
+    "text-classification": "cardiffnlp/twitter-roberta-base-sentiment-latest",
+    "zero-shot-classification": "facebook/bart-large-mnli"
+}
+
+# AIProcessor attribute holding each pipeline
+PIPELINE_ATTRIBUTES = {
+    "summarization": "summarizer",
+    "question-answering": "qa_pipeline",
+    "text-classification": "classifier",
+    "zero-shot-classification": "zero_shot_classifier"
+}
+
+# Hugging Face download cache (None uses the hub default, ~/.cache/huggingface).
+# With CONTRACTIQ_OFFLINE=1 models are only read from this cache, so a missing
+# snapshot fails fast instead of silently re-downloading.
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR")
+OFFLINE = os.getenv("CONTRACTIQ_OFFLINE") == "1"
+
+def hub_kwargs(local_files_only: bool = OFFLINE) -> Dict:
+    """Keyword arguments for from_pretrained/pipeline loads from the Hugging Face hub"""
+    return {"cache_dir": MODEL_CACHE_DIR, "local_files_only": local_files_only}
+
+def download_models():
+    """Populate the model cache with every pipeline's weights (e.g. at image build time)"""
+    if pipeline is None:
+        raise RuntimeError("Transformers not available. Please install: pip install transformers torch")
+    
+    for task, model_name in MODEL_NAMES.items():
+        logger.info(f"Downloading {task} model: {model_name}")
+        pipeline(task, model=model_name, model_kwargs=hub_kwargs(local_files_only=False))
+
+# Tasks whose model forward is compiled with torch.compile (CONTRACTIQ_TORCH_COMPILE=1).
+# Input lengths vary per document, so graphs are compiled with dynamic shapes to
+# avoid recompiling for every new sequence length.
+COMPILE_TASKS = ("summarization", "question-answering", "zero-shot-classification")
+
+# Representative input used to pay compile and first-call costs in prewarm
+WARMUP_TEXT = (
+    "This Agreement may be terminated by either party upon thirty days written notice. "
+    "The Client shall pay all invoices within 30 days of receipt. Neither party shall be "
+    "liable for indirect or consequential damages arising out of this Agreement."
+)
+
+# Long documents are summarized map-reduce style: overlapping windows of the
+# token sequence are summarized in one batch, then the partial summaries are
+# summarized together. Beyond SUMMARY_MAX_CHUNKS windows, evenly spaced ones
+# are used so latency stays bounded on very long documents.
+SUMMARY_MAX_INPUT_TOKENS = 1024
+SUMMARY_CHUNK_STRIDE = 128
+SUMMARY_MAX_CHUNKS = 8
+SUMMARY_PARTIAL_LENGTH = 80
+
+# Exported ONNX graphs are cached here so the export cost is only paid once
+ONNX_CACHE_DIR = Path(os.getenv("CONTRACTIQ_ONNX_CACHE", Path.home() / ".cache" / "contractiq" / "onnx"))
+
+# Tasks whose models are quantized to INT8 by quantize_models.py. The summarizer
+# stays FP32 because BART generation degrades noticeably when quantized.
+INT8_TASKS = ("question-answering", "text-classification", "zero-shot-classification")
+INT8_MODEL_DIR = Path(os.getenv("CONTRACTIQ_INT8_DIR", Path.home() / ".cache" / "contractiq" / "int8"))
+
+# Risk indicator patterns, matched against the lowercased document
+RISK_PATTERNS = {
+    "Unlimited Liability": r"unlimited.*liability",
+    "Personal Guarantee": r"personal.*guarantee",
+    "Automatic Renewal": r"automatic.*renew",
+    "Liquidated Damages": r"liquidated.*damages",
+    "Non-Compete": r"non.?compete",
+    "Exclusive Dealing": r"exclusive.*dealing"
+}
+
+# All risk patterns fused into one alternation of named groups. Each alternative
+# sits inside a lookahead so matches never consume text, which keeps one greedy
+# ".*" from hiding another indicator further along the line.
+_RISK_GROUPS = {f"risk{i}": name for i, name in enumerate(RISK_PATTERNS)}
+_RISK_RE = re.compile("|".join(
+    f"(?=(?P<{group}>{RISK_PATTERNS[name]}))" for group, name in _RISK_GROUPS.items()
+))
+
+# Entity patterns fused into one alternation, so a document is scanned once
+_ENTITY_RE = re.compile(
+    r'(?P<company>\b[A-Z][a-z]+ (?:Inc|LLC|Corp|Corporation|Company|Ltd)\b)'
+    r'|(?P<date>\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b)'
+    r'|(?P<money>\$[\d,]+(?:\.\d{2})?)'
+)
+
+# Entities reported per kind, in report order
+ENTITY_LIMITS = {"company": 3, "date": 2, "money": 2}
+
+# Memoized analysis results, keyed by a hash of the document text. Set
+# CONTRACTIQ_CACHE=0 to disable. Without diskcache a small in-memory LRU is used.
+ANALYSIS_CACHE_DIR = Path(os.getenv("CONTRACTIQ_CACHE_DIR", Path.home() / ".cache" / "contractiq" / "analysis"))
+ANALYSIS_CACHE_SIZE_LIMIT = 2 ** 30
+ANALYSIS_CACHE_TTL = int(os.getenv("CONTRACTIQ_CACHE_TTL", 7 * 24 * 3600))
+MEMORY_CACHE_ENTRIES = 256
+
+def _digest(data: bytes) -> str:
+    """64-bit hex digest of data (xxh3 when available, blake2b otherwise)"""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+# Part of every cache key, so switching models invalidates earlier results
+_CACHE_NAMESPACE = _digest(json.dumps(MODEL_NAMES, sort_keys=True).encode())
+
+class _MemoryCache:
+    """Thread-safe in-memory LRU with per-entry expiry, used when diskcache is missing"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, expire: Optional[float] = None):
+        expires_at = time.monotonic() + expire if expire is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class _Fallback(str):
+    """
+    Degraded result of an AIProcessor method, returned when its model failed
+    to load or raised. _cached does not store these, so a transient failure
+    is retried on the next call instead of being served until the entry expires.
+    """
+
+def is_fallback(result) -> bool:
+    """True for a degraded AIProcessor result, which must not be cached"""
+    return isinstance(result, _Fallback)
+
+def _cached(method):
+    """Memoize an AIProcessor method on the document hash and its other arguments"""
+    @functools.wraps(method)
+    def wrapper(self, text: str, *args, **kwargs):
+        if self._result_cache is None:
+            return method(self, text, *args, **kwargs)
+        
+        key = (_CACHE_NAMESPACE, method.__name__, self._text_digest(text), args, tuple(sorted(kwargs.items())))
+        result = self._result_cache.get(key)
+        if result is None:
+            result = method(self, text, *args, **kwargs)
+            if not isinstance(result, _Fallback):
+                self._result_cache.set(key, result, expire=ANALYSIS_CACHE_TTL)
+        return result
+    return wrapper
+
+def _find_all(text: str, word: str):
+    """Yield the start offset of every (possibly overlapping) occurrence of word"""
+    position = text.find(word)
+    while position != -1:
+        yield position
+        position = text.find(word, position + 1)
+
+def _iter_sentences(text: str):
+    """Lazily yield the same pieces as text.split('.'), so callers taking the first few stop early"""
+    start = 0
+    end = text.find('.')
+    while end != -1:
+        yield text[start:end]
+        start = end + 1
+        end = text.find('.', start)
+    yield text[start:]
+
+def model_dir_name(model_name: str) -> str:
+    """Filesystem-safe directory name for a Hub model id"""
+    return model_name.replace("/", "--")
+
+# Keyword lists, lowercased once at import so scans only need the lowered
+# document. Tuples keep the order used in reports.
+COMPLIANCE_ELEMENTS = {
+    category: tuple(kw.lower() for kw in keywords)
+    for category, keywords in {
+        "Data Protection": ["personal data", "privacy", "gdpr", "data protection", "consent"],
+        "Financial Compliance": ["sox", "sarbanes", "financial disclosure", "audit", "accounting"],
+        "Employment Law": ["equal opportunity", "discrimination", "harassment", "workplace safety"],
+        "Contract Law": ["force majeure", "indemnification", "limitation of liability", "termination"]
+    }.items()
+}
+
+HIGH_RISK_TERMS = tuple(term.lower() for term in [
+    "unlimited liability", "personal guarantee", "liquidated damages",
+    "automatic renewal", "non-compete", "exclusive dealing"
+])
+
+MEDIUM_RISK_TERMS = tuple(term.lower() for term in [
+    "indemnification", "force majeure", "intellectual property",
+    "confidentiality", "termination", "penalty"
+])
+
+CLAUSE_KEYWORDS = {
+    category: tuple(kw.lower() for kw in keywords)
+    for category, keywords in {
+        "Termination": ["terminate", "termination", "end this agreement", "expire"],
+        "Payment": ["payment", "pay", "invoice", "fee", "cost", "price"],
+        "Liability": ["liable", "liability", "responsible", "damages", "loss"],
+        "Confidentiality": ["confidential", "non-disclosure", "proprietary", "secret"]
+    }.items()
+}
+
+RISK_KEYWORDS = tuple(term.lower() for term in [
+    "penalty", "damages", "liability", "breach", "default",
+    "termination", "indemnify", "sue", "court", "arbitration"
+])
+
+# Marker terms for each document type, checked in order
+DOCUMENT_TYPE_MARKERS = (
+    ("Employment Agreement", frozenset(["employment", "employee", "employer", "job"])),
+    ("Non-Disclosure Agreement", frozenset(["non-disclosure", "nda", "confidential"])),
+    ("Service Agreement", frozenset(["service", "services", "provider"])),
+    ("Partnership Agreement", frozenset(["partnership", "partner", "joint venture"])),
+    ("Sales Agreement", frozenset(["sale", "purchase", "buy", "sell"]))
+)
+
+def _category_index(categories: Dict[str, tuple]) -> Dict[str, tuple]:
+    """Reverse index mapping each keyword to the categories that list it"""
+    index = {}
+    for category, keywords in categories.items():
+        for keyword in keywords:
+            index[keyword] = index.get(keyword, ()) + (category,)
+    return index
+
+# Frozen sets and reverse indexes, so the keyword hits of a document are
+# resolved with set intersections instead of scanning every list
+_COMPLIANCE_INDEX = _category_index(COMPLIANCE_ELEMENTS)
+_CLAUSE_INDEX = _category_index(CLAUSE_KEYWORDS)
+_COMPLIANCE_KEYWORDS = frozenset(_COMPLIANCE_INDEX)
+_CLAUSE_KEYWORD_SET = frozenset(_CLAUSE_INDEX)
+_HIGH_RISK_SET = frozenset(HIGH_RISK_TERMS)
+_MEDIUM_RISK_SET = frozenset(MEDIUM_RISK_TERMS)
+_RISK_KEYWORD_SET = frozenset(RISK_KEYWORDS)
+_DOCUMENT_TYPE_KEYWORDS = frozenset().union(*(markers for _, markers in DOCUMENT_TYPE_MARKERS))
+
+# One automaton over every keyword list, so a document is scanned once
+_KEYWORD_MATCHER = KeywordMatcher(
+    _COMPLIANCE_KEYWORDS | _HIGH_RISK_SET | _MEDIUM_RISK_SET | _CLAUSE_KEYWORD_SET | _RISK_KEYWORD_SET
+    | _DOCUMENT_TYPE_KEYWORDS
+)
+
+def _matched_by_category(categories: Dict[str, tuple], index: Dict[str, tuple], matched: set) -> Dict[str, List[str]]:
+    """Group matched keywords by category, in the order of the keyword lists"""
+    hit_categories = {category for keyword in matched for category in index[keyword]}
+    return {
+        category: [kw for kw in keywords if kw in matched]
+        for category, keywords in categories.items()
+        if category in hit_categories
+    }
+
+ORT_MODEL_CLASSES = {
+    "summarization": ORTModelForSeq2SeqLM,
+    "question-answering": ORTModelForQuestionAnswering,
+    "text-classification": ORTModelForSequenceClassification,
+    "zero-shot-classification": ORTModelForSequenceClassification
+}
+
 class AIProcessor:
     """
     AI processor using Hugging Face Transformers for document analysis
     """
     
     def __init__(self):
-        self.device = 0 if torch.cuda.is_available() else -1
-        logger.info(f"AIProcessor initialized with device: {'GPU' if self.device == 0 else 'CPU'}")
+        self.device = 0 if torch is not None and torch.cuda.is_available() else -1
+        self.use_onnx = os.getenv("CONTRACTIQ_ONNX") == "1" and ORTModelForSeq2SeqLM is not None
+        self.use_bettertransformer = os.getenv("CONTRACTIQ_BETTERTRANSFORMER") != "0" and BetterTransformer is not None
+        self.use_torch_compile = (os.getenv("CONTRACTIQ_TORCH_COMPILE") == "1" and torch is not None
+                                  and hasattr(torch, "compile"))
+        self.load_in_8bit = (os.getenv("CONTRACTIQ_LOAD_8BIT") == "1" and self.device == 0
+                             and bitsandbytes is not None and accelerate is not None)
+        self._lower_cache = ("", "")
+        self._hits_cache = ("", set())
+        self._digest_cache = ("", _digest(b""))
+        self._result_cache = self._open_result_cache()
+        self._last_inference = time.monotonic()
         
-        # Initialize models
-        self._init_models()
+        # Models are loaded on first use (or by prewarm) instead of at startup
+        self._load_locks = {task: threading.Lock() for task in PIPELINE_ATTRIBUTES}
+        
+        logger.info(f"AIProcessor initialized with device: {'GPU' if self.device == 0 else 'CPU'}"
+                    f"{' (ONNX Runtime)' if self.use_onnx else ''}")
+    
+    @cached_property
+    def summarizer(self):
+        """Summarization model"""
+        return self._load_model("summarization")
+    
+    @cached_property
+    def qa_pipeline(self):
+        """Question answering model"""
+        return self._load_model("question-answering")
+    
+    @cached_property
+    def classifier(self):
+        """Text classification for sentiment/risk"""
+        return self._load_model("text-classification")
+    
+    @cached_property
+    def zero_shot_classifier(self):
+        """Zero-shot classification for clause detection"""
+        return self._load_model("zero-shot-classification")
+    
+    def prewarm(self):
+        """Load all models concurrently (downloads are I/O-bound)"""
+        with ThreadPoolExecutor(max_workers=len(PIPELINE_ATTRIBUTES)) as executor:
+            loaded = list(executor.map(self._prewarm_task, PIPELINE_ATTRIBUTES))
+        
+        if all(pipe is not None for pipe in loaded):
+            logger.info("All AI models loaded successfully")
     
-    def _init_models(self):
-        """Initialize Hugging Face models"""
+    def _prewarm_task(self, task: str):
+        """Load one pipeline and, when compiling, run a sample input through it"""
+        pipe = getattr(self, PIPELINE_ATTRIBUTES[task])
+        if pipe is None or not (self.use_torch_compile and task in COMPILE_TASKS):
+            return pipe
+        
         try:
-            # Summarization model
-            self.summarizer = pipeline(
-                "summarization",
-                model="facebook/bart-large-cnn",
-                device=self.device
-            )
-            
-            # Question answering model
-            self.qa_pipeline = pipeline(
-                "question-answering",
-                model="distilbert-base-cased-distilled-squad",
-                device=self.device
-            )
-            
-            # Text classification for sentiment/risk
-            self.classifier = pipeline(
-                "text-classification",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                device=self.device
-            )
-            
-            # Zero-shot classification for clause detection
-            self.zero_shot_classifier = pipeline(
-                "zero-shot-classification",
-                model="facebook/bart-large-mnli",
-                device=self.device
-            )
+            with self._inference():
+                if task == "summarization":
+                    pipe(WARMUP_TEXT, max_length=60, min_length=10, do_sample=False)
+                elif task == "question-answering":
+                    pipe(question="When must invoices be paid?", context=WARMUP_TEXT)
+                elif task == "zero-shot-classification":
+                    self._zero_shot_scores([WARMUP_TEXT], ["payment terms", "termination clause"])
+            logger.info(f"Compiled {task} model")
+        except Exception as e:
+            logger.warning(f"Warmup of {task} model failed: {str(e)}")
+        return pipe
+    
+    def _load_model(self, task: str):
+        """Load the pipeline for a task, or None so callers use rule-based fallbacks"""
+        attribute = PIPELINE_ATTRIBUTES[task]
+        with self._load_locks[task]:
+            # Another thread may have finished loading while we waited
+            if attribute in self.__dict__:
+                return self.__dict__[attribute]
             
-            logger.info("All AI models loaded successfully")
+            if pipeline is None:
+                return None
             
+            try:
+                pipe = self._load_pipeline(task)
+                logger.info(f"Loaded {task} model: {MODEL_NAMES[task]}")
+                return pipe
+            except Exception as e:
+                logger.error(f"Error loading {task} model: {str(e)}")
+                # Fallback to simpler models or rule-based processing
+                return None
+    
+    def _load_pipeline(self, task: str):
+        """Build a Hugging Face pipeline, backed by ONNX Runtime or INT8 weights when available"""
+        model_name = MODEL_NAMES[task]
+        
+        if self.use_onnx:
+            return self._load_onnx_pipeline(task, model_name)
+        
+        int8_dir = INT8_MODEL_DIR / model_dir_name(model_name)
+        if self.device == -1 and task in INT8_TASKS and OptimizedModel is not None and int8_dir.exists():
+            logger.info(f"Loading INT8 model for {task} from {int8_dir}")
+            model = OptimizedModel.from_pretrained(int8_dir)
+            tokenizer = AutoTokenizer.from_pretrained(int8_dir, use_fast=True)
+            return pipeline(task, model=model, tokenizer=tokenizer, device=self.device)
+        
+        # Half precision on GPU halves weight memory and bandwidth
+        torch_dtype = torch.float16 if self.device == 0 else None
+        tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True, **hub_kwargs())
+        model_kwargs = hub_kwargs()
+        if accelerate is not None:
+            # Materialize weights directly in their final dtype instead of
+            # building a randomly initialized FP32 model first
+            model_kwargs["low_cpu_mem_usage"] = True
+        
+        if self.load_in_8bit:
+            # bitsandbytes 8-bit weights halve GPU memory again; accelerate
+            # places the quantized model, so the pipeline gets no device
+            logger.info(f"Loading {task} model with 8-bit weights")
+            model_kwargs["load_in_8bit"] = True
+            return pipeline(task, model=model_name, tokenizer=tokenizer, device_map="auto",
+                            torch_dtype=torch_dtype, model_kwargs=model_kwargs)
+        
+        pipe = pipeline(task, model=model_name, tokenizer=tokenizer, device=self.device,
+                        torch_dtype=torch_dtype, model_kwargs=model_kwargs)
+        
+        if self.use_bettertransformer:
+            pipe.model = self._to_bettertransformer(task, pipe.model)
+        if self.use_torch_compile and task in COMPILE_TASKS:
+            # Compile forward rather than wrapping the module, so the pipeline
+            # and generate() keep seeing the original model class
+            mode = "reduce-overhead" if self.device == 0 else "default"
+            pipe.model.forward = torch.compile(pipe.model.forward, mode=mode, dynamic=True)
+        return pipe
+    
+    def _to_bettertransformer(self, task: str, model):
+        """Swap attention layers for BetterTransformer's fused SDPA kernels when supported"""
+        try:
+            return BetterTransformer.transform(model)
         except Exception as e:
-            logger.error(f"Error loading AI models: {str(e)}")
-            # Fallback to simpler models or rule-based processing
-            self.summarizer = None
-            self.qa_pipeline = None
-            self.classifier = None
-            self.zero_shot_classifier = None
+            logger.warning(f"BetterTransformer not applied to {task} model: {str(e)}")
+            return model
+    
+    def _load_onnx_pipeline(self, task: str, model_name: str):
+        """Build a pipeline on top of an exported ONNX Runtime model"""
+        ort_class = ORT_MODEL_CLASSES[task]
+        provider = "CUDAExecutionProvider" if self.device == 0 else "CPUExecutionProvider"
+        export_dir = ONNX_CACHE_DIR / model_dir_name(model_name)
+        
+        if export_dir.exists():
+            model = ort_class.from_pretrained(export_dir, provider=provider)
+            tokenizer = AutoTokenizer.from_pretrained(export_dir, use_fast=True)
+        else:
+            # First run: export to ONNX and keep the optimized graph for later starts
+            logger.info(f"Exporting {model_name} to ONNX (one-time cost)")
+            model = ort_class.from_pretrained(model_name, export=True, provider=provider, **hub_kwargs())
+            tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True, **hub_kwargs())
+            model.save_pretrained(export_dir)
+            tokenizer.save_pretrained(export_dir)
+        
+        return pipeline(task, model=model, tokenizer=tokenizer, device=self.device)
+    
+    def _open_result_cache(self):
+        """Open the analysis result cache, or None when caching is disabled"""
+        if os.getenv("CONTRACTIQ_CACHE") == "0":
+            return None
+        
+        if diskcache is not None:
+            try:
+                return diskcache.Cache(str(ANALYSIS_CACHE_DIR), size_limit=ANALYSIS_CACHE_SIZE_LIMIT)
+            except Exception as e:
+                logger.warning(f"Could not open analysis cache at {ANALYSIS_CACHE_DIR}: {str(e)}")
+        
+        return _MemoryCache(MEMORY_CACHE_ENTRIES)
+    
+    def _text_digest(self, text: str) -> str:
+        """Hash of the document text, reusing the digest of the most recent document"""
+        cached_text, cached_digest = self._digest_cache
+        if cached_text is text:
+            return cached_digest
+        digest = _digest(text.encode("utf-8", "surrogatepass"))
+        self._digest_cache = (text, digest)
+        return digest
+    
+    def _lower(self, text: str) -> str:
+        """Return text.lower(), reusing the copy made for the most recent document"""
+        cached_text, cached_lower = self._lower_cache
+        if cached_text is text:
+            return cached_lower
+        text_lower = text.lower()
+        self._lower_cache = (text, text_lower)
+        return text_lower
+    
+    def _keyword_hits(self, text: str) -> set:
+        """Return the set of known keywords present in text, scanning each document once"""
+        cached_text, cached_hits = self._hits_cache
+        if cached_text is text:
+            return cached_hits
+        hits = _KEYWORD_MATCHER.find(self._lower(text))
+        self._hits_cache = (text, hits)
+        return hits
+    
+    def _inference(self):
+        """
+        Context manager for model calls: disables autograd bookkeeping and, on
+        GPU, runs eligible ops in FP16 under autocast
+        """
+        if torch is None:
+            return contextlib.nullcontext()
+        
+        self._last_inference = time.monotonic()
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if self.device == 0:
+            stack.enter_context(torch.autocast(device_type="cuda", dtype=torch.float16))
+        return stack
     
+    def release_memory(self, min_idle_seconds: float = 0) -> bool:
+        """
+        Return cached, unused CUDA allocator blocks to the GPU
+        
+        Args:
+            min_idle_seconds: Only release if no inference started within this many seconds
+            
+        Returns:
+            True if memory was released
+        """
+        if self.device != 0:
+            return False
+        if time.monotonic() - self._last_inference < min_idle_seconds:
+            return False
+        
+        torch.cuda.empty_cache()
+        return True
+    
+    @_cached
     def analyze_document(self, text: str, question: Optional[str] = None) -> str:
         """
         Perform general document analysis
@@ -80,30 +606,41 @@ class AIProcessor:
         """
         try:
             analysis_parts = []
+            degraded = False
             
-            # Document summary
-            summary = self.summarize_document(text)
-            analysis_parts.append(f"**Document Summary:**\n{summary}\n")
-            
-            # Key insights
-            insights = self._extract_key_insights(text)
-            analysis_parts.append(f"**Key Insights:**\n{insights}\n")
-            
-            # Answer specific question if provided
-            if question:
-                answer = self.answer_question(text, question)
-                analysis_parts.append(f"**Answer to your question:**\n{answer}\n")
+            # Run every model call of this analysis under a single inference context
+            with self._inference():
+                # Document summary
+                summary = self.summarize_document(text)
+                degraded |= isinstance(summary, _Fallback)
+                analysis_parts.append(f"**Document Summary:**\n{summary}\n")
+                
+                # Key insights
+                insights = self._extract_key_insights(text)
+                analysis_parts.append(f"**Key Insights:**\n{insights}\n")
+                
+                # Answer specific question if provided
+                if question:
+                    answer = self.answer_question(text, question)
+                    degraded |= isinstance(answer, _Fallback)
+                    analysis_parts.append(f"**Answer to your question:**\n{answer}\n")
             
             # Risk assessment
             risk_level = self._assess_risk_level(text)
             analysis_parts.append(f"**Risk Assessment:**\n{risk_level}\n")
             
-            return "\n".join(analysis_parts)
+            analysis = "\n".join(analysis_parts)
+            return _Fallback(analysis) if degraded else analysis
         
         except Exception as e:
             logger.error(f"Error in document analysis: {str(e)}")
-            return f"Analysis completed with basic text processing. Document contains {len(text)} characters. For specific questions, please provide more details."
+            return _Fallback(f"Analysis completed with basic text processing. Document contains {len(text)} characters. For specific questions, please provide more details.")
+        
+        finally:
+            # Hand activation memory back to the GPU between documents
+            self.release_memory()
     
+    @_cached
     def summarize_document(self, text: str, max_length: int = 150) -> str:
         """
         Generate document summary
@@ -117,32 +654,66 @@ class AIProcessor:
         """
         try:
             if self.summarizer and len(text) > 100:
-                # Chunk text if too long
-                max_chunk_length = 1024
-                if len(text) > max_chunk_length:
-                    # Take first and last parts for summary
-                    text_chunk = text[:max_chunk_length//2] + text[-max_chunk_length//2:]
-                else:
-                    text_chunk = text
+                tokenizer = self.summarizer.tokenizer
                 
-                summary = self.summarizer(
-                    text_chunk,
-                    max_length=max_length,
-                    min_length=30,
-                    do_sample=False
-                )
-                return summary[0]['summary_text']
+                # Tokenize once and window the encoder input by tokens, not characters
+                token_ids = tokenizer(text, add_special_tokens=False, truncation=False).input_ids
+                windows = self._summary_windows(token_ids)
+                
+                with self._inference():
+                    if len(windows) == 1:
+                        return self._generate_summaries(windows, max_length, min_length=30)[0]
+                    
+                    partials = self._generate_summaries(windows, SUMMARY_PARTIAL_LENGTH, min_length=10)
+                    combined = tokenizer(" ".join(partials), truncation=True,
+                                         max_length=SUMMARY_MAX_INPUT_TOKENS).input_ids
+                    return self._generate_summaries([combined], max_length, min_length=30)[0]
             else:
-                # Fallback: extract first few sentences
-                sentences = text.split('.')[:3]
-                return '. '.join(sentences) + '.'
+                # Fallback: extract first few sentences. Short texts always take
+                # this path; for longer ones it stands in for the missing model
+                sentences = islice(_iter_sentences(text), 3)
+                summary = '. '.join(sentences) + '.'
+                return summary if len(text) <= 100 else _Fallback(summary)
         
         except Exception as e:
             logger.error(f"Error in summarization: {str(e)}")
             # Fallback summary
             words = text.split()[:50]
-            return ' '.join(words) + "..."
+            return _Fallback(' '.join(words) + "...")
+    
+    def _summary_windows(self, token_ids: List[int]) -> List[List[int]]:
+        """
+        Split a token sequence into overlapping summarizer inputs
+        
+        Args:
+            token_ids: Document tokens without special tokens
+            
+        Returns:
+            Model inputs (with special tokens) of at most SUMMARY_MAX_INPUT_TOKENS each
+        """
+        tokenizer = self.summarizer.tokenizer
+        body = SUMMARY_MAX_INPUT_TOKENS - tokenizer.num_special_tokens_to_add()
+        step = body - SUMMARY_CHUNK_STRIDE
+        starts = list(range(0, max(len(token_ids) - SUMMARY_CHUNK_STRIDE, 1), step))
+        if len(starts) > SUMMARY_MAX_CHUNKS:
+            last = len(starts) - 1
+            starts = [starts[round(i * last / (SUMMARY_MAX_CHUNKS - 1))] for i in range(SUMMARY_MAX_CHUNKS)]
+        return [tokenizer.build_inputs_with_special_tokens(token_ids[start:start + body]) for start in starts]
+    
+    def _generate_summaries(self, inputs: List[List[int]], max_length: int, min_length: int) -> List[str]:
+        """Summarize a batch of tokenized inputs with one generate call"""
+        tokenizer = self.summarizer.tokenizer
+        batch = tokenizer.pad({"input_ids": inputs}, return_tensors="pt").to(self.summarizer.device)
+        output_ids = self.summarizer.model.generate(
+            input_ids=batch["input_ids"],
+            attention_mask=batch["attention_mask"],
+            max_length=max_length,
+            min_length=min_length,
+            do_sample=False
+        )
+        return tokenizer.batch_decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
     
+    @_cached
     def answer_question(self, text: str, question: str) -> str:
         """
         Answer specific question about the document
@@ -160,35 +731,57 @@ class AIProcessor:
                 max_context_length = 512
                 if len(text) > max_context_length:
                     # Try to find relevant section
-                    text_lower = text.lower()
+                    text_lower = self._lower(text)
                     question_lower = question.lower()
                     
                     # Look for keywords from question in text
                     question_words = question_lower.split()
-                    best_start = 0
-                    best_score = 0
-                    
-                    for i in range(0, len(text) - max_context_length, 100):
-                        chunk = text[i:i + max_context_length].lower()
-                        score = sum(1 for word in question_words if word in chunk)
-                        if score > best_score:
-                            best_score = score
-                            best_start = i
+                    best_start = self._best_context_start(text_lower, question_words, max_context_length)
                     
                     context = text[best_start:best_start + max_context_length]
                 else:
                     context = text
                 
-                result = self.qa_pipeline(question=question, context=context)
+                with self._inference():
+                    result = self.qa_pipeline(question=question, context=context)
                 return f"{result['answer']} (Confidence: {result['score']:.2f})"
             else:
                 # Fallback: simple keyword search
-                return self._simple_question_answer(text, question)
+                return _Fallback(self._simple_question_answer(text, question))
         
         except Exception as e:
             logger.error(f"Error answering question: {str(e)}")
-            return f"I found relevant information in the document, but couldn't process your specific question. Please try rephrasing or ask about specific terms mentioned in the document."
+            return _Fallback("I found relevant information in the document, but couldn't process your specific question. Please try rephrasing or ask about specific terms mentioned in the document.")
     
+    def _best_context_start(self, text_lower: str, question_words: List[str],
+                            window: int, step: int = 100) -> int:
+        """
+        Pick the window start (a multiple of step) containing the most question words
+        
+        A window scores one point per question word that occurs entirely inside it.
+        Scores for all windows are computed with NumPy from each word's match
+        positions instead of re-scanning every window.
+        """
+        starts = np.arange(0, len(text_lower) - window, step, dtype=np.int64)
+        if starts.size == 0:
+            return 0
+        
+        scores = np.zeros(starts.size, dtype=np.int64)
+        for word, count in Counter(question_words).items():
+            positions = np.fromiter(_find_all(text_lower, word), dtype=np.int64)
+            if positions.size == 0:
+                continue
+            # First occurrence at or after each window start, if it ends inside the window
+            idx = np.searchsorted(positions, starts)
+            in_range = idx < positions.size
+            first = positions[np.minimum(idx, positions.size - 1)]
+            present = in_range & (first + len(word) <= starts + window)
+            scores += present * count
+        
+        # argmax returns the earliest best window, and 0 when nothing matches
+        return int(starts[np.argmax(scores)])
+    
+    @_cached
     def analyze_compliance(self, text: str, question: Optional[str] = None) -> str:
         """
         Analyze document for compliance issues
@@ -196,18 +789,12 @@ class AIProcessor:
         try:
             compliance_analysis = []
             
-            # Check for common compliance elements
-            compliance_elements = {
-                "Data Protection": ["personal data", "privacy", "gdpr", "data protection", "consent"],
-                "Financial Compliance": ["sox", "sarbanes", "financial disclosure", "audit", "accounting"],
-                "Employment Law": ["equal opportunity", "discrimination", "harassment", "workplace safety"],
-                "Contract Law": ["force majeure", "indemnification", "limitation of liability", "termination"]
-            }
+            matched = self._keyword_hits(text) & _COMPLIANCE_KEYWORDS
             
-            for category, keywords in compliance_elements.items():
-                found_keywords = [kw for kw in keywords if kw.lower() in text.lower()]
-                if found_keywords:
-                    compliance_analysis.append(f"**{category}:** Found references to {', '.join(found_keywords)}")
+            # Check for common compliance elements
+            found = _matched_by_category(COMPLIANCE_ELEMENTS, _COMPLIANCE_INDEX, matched)
+            for category, found_keywords in found.items():
+                compliance_analysis.append(f"**{category}:** Found references to {', '.join(found_keywords)}")
             
             if not compliance_analysis:
                 compliance_analysis.append("No specific compliance keywords detected. Manual review recommended.")
@@ -221,8 +808,9 @@ class AIProcessor:
         
         except Exception as e:
             logger.error(f"Error in compliance analysis: {str(e)}")
-            return "Compliance analysis completed. Please review document manually for specific regulatory requirements."
+            return _Fallback("Compliance analysis completed. Please review document manually for specific regulatory requirements.")
     
+    @_cached
     def assess_risks(self, text: str, question: Optional[str] = None) -> str:
         """
         Assess risks in the document
@@ -230,19 +818,11 @@ class AIProcessor:
         try:
             risk_analysis = []
             
-            # High-risk terms
-            high_risk_terms = [
-                "unlimited liability", "personal guarantee", "liquidated damages",
-                "automatic renewal", "non-compete", "exclusive dealing"
-            ]
-            
-            medium_risk_terms = [
-                "indemnification", "force majeure", "intellectual property",
-                "confidentiality", "termination", "penalty"
-            ]
-            
-            found_high_risk = [term for term in high_risk_terms if term.lower() in text.lower()]
-            found_medium_risk = [term for term in medium_risk_terms if term.lower() in text.lower()]
+            hits = self._keyword_hits(text)
+            high_hits = hits & _HIGH_RISK_SET
+            medium_hits = hits & _MEDIUM_RISK_SET
+            found_high_risk = [term for term in HIGH_RISK_TERMS if term in high_hits]
+            found_medium_risk = [term for term in MEDIUM_RISK_TERMS if term in medium_hits]
             
             if found_high_risk:
                 risk_analysis.append(f"**HIGH RISK TERMS DETECTED:** {', '.join(found_high_risk)}")
@@ -265,8 +845,9 @@ class AIProcessor:
         
         except Exception as e:
             logger.error(f"Error in risk assessment: {str(e)}")
-            return "Risk assessment completed. Please review document for specific risk factors."
+            return _Fallback("Risk assessment completed. Please review document for specific risk factors.")
     
+    @_cached
     def analyze_clauses(self, text: str, question: Optional[str] = None) -> str:
         """
         Analyze and classify clauses in the document
@@ -281,36 +862,77 @@ class AIProcessor:
                 "dispute resolution clause", "force majeure clause"
             ]
             
-            if self.zero_shot_classifier:
+            classifier_loaded = self.zero_shot_classifier is not None
+            if classifier_loaded:
                 # Use AI to classify text sections
-                sentences = text.split('.')[:20]  # Analyze first 20 sentences
-                for sentence in sentences:
-                    if len(sentence.strip()) > 20:
-                        result = self.zero_shot_classifier(sentence, clause_types)
-                        if result['scores'][0] > 0.5:  # High confidence
-                            clause_analysis.append(f"**{result['labels'][0]}:** {sentence.strip()}")
+                sentences = islice(_iter_sentences(text), 20)  # Analyze first 20 sentences
+                candidates = [sentence.strip() for sentence in sentences if len(sentence.strip()) > 20]
+                if candidates:
+                    with self._inference():
+                        scores = self._zero_shot_scores(candidates, clause_types)
+                    for sentence, sentence_scores in zip(candidates, scores):
+                        best = int(sentence_scores.argmax())
+                        if sentence_scores[best] > 0.5:  # High confidence
+                            clause_analysis.append(f"**{clause_types[best]}:** {sentence}")
             else:
                 # Fallback: keyword-based detection
-                clause_keywords = {
-                    "Termination": ["terminate", "termination", "end this agreement", "expire"],
-                    "Payment": ["payment", "pay", "invoice", "fee", "cost", "price"],
-                    "Liability": ["liable", "liability", "responsible", "damages", "loss"],
-                    "Confidentiality": ["confidential", "non-disclosure", "proprietary", "secret"]
-                }
-                
-                for clause_type, keywords in clause_keywords.items():
-                    found = [kw for kw in keywords if kw.lower() in text.lower()]
-                    if found:
-                        clause_analysis.append(f"**{clause_type} Clause:** Keywords found - {', '.join(found)}")
+                matched = self._keyword_hits(text) & _CLAUSE_KEYWORD_SET
+                found_by_type = _matched_by_category(CLAUSE_KEYWORDS, _CLAUSE_INDEX, matched)
+                for clause_type, found in found_by_type.items():
+                    clause_analysis.append(f"**{clause_type} Clause:** Keywords found - {', '.join(found)}")
             
             if not clause_analysis:
                 clause_analysis.append("No specific clauses automatically detected. Manual review recommended.")
             
-            return "\n".join(clause_analysis)
+            analysis = "\n".join(clause_analysis)
+            return analysis if classifier_loaded else _Fallback(analysis)
         
         except Exception as e:
             logger.error(f"Error in clause analysis: {str(e)}")
-            return "Clause analysis completed. Please review document for specific clause types."
+            return _Fallback("Clause analysis completed. Please review document for specific clause types.")
+    
+    def _zero_shot_scores(self, sequences: List[str], labels: List[str],
+                          hypothesis_template: str = "This example is {}.") -> np.ndarray:
+        """
+        Zero-shot classify sequences with a single batched MNLI forward
+        
+        Every (sequence, label hypothesis) pair is tokenized in one call and run
+        through the model in one batch, instead of the pipeline's per-pair steps.
+        Scores match the pipeline's single-label mode: a softmax over each
+        sequence's entailment logits.
+        
+        Args:
+            sequences: Texts to classify
+            labels: Candidate labels
+            hypothesis_template: Template turning a label into an NLI hypothesis
+            
+        Returns:
+            Array of shape (len(sequences), len(labels)) with label probabilities
+        """
+        tokenizer = self.zero_shot_classifier.tokenizer
+        model = self.zero_shot_classifier.model
+        
+        premises = [sequence for sequence in sequences for _ in labels]
+        hypotheses = [hypothesis_template.format(label) for _ in sequences for label in labels]
+        encoded = tokenizer(
+            premises,
+            hypotheses,
+            padding=True,
+            truncation="only_first",
+            return_tensors="pt"
+        ).to(self.zero_shot_classifier.device)
+        
+        logits = model(**encoded).logits
+        entailment = logits[:, self._entailment_id(model)].reshape(len(sequences), len(labels))
+        return entailment.float().softmax(dim=-1).cpu().numpy()
+    
+    @staticmethod
+    def _entailment_id(model) -> int:
+        """Index of the entailment logit in an NLI model's output"""
+        for label, index in model.config.label2id.items():
+            if label.lower().startswith("entail"):
+                return index
+        return -1
     
     def _extract_key_insights(self, text: str) -> str:
         """Extract key insights from document"""
@@ -333,12 +955,7 @@ class AIProcessor:
     
     def _assess_risk_level(self, text: str) -> str:
         """Simple risk level assessment"""
-        risk_keywords = [
-            "penalty", "damages", "liability", "breach", "default",
-            "termination", "indemnify", "sue", "court", "arbitration"
-        ]
-        
-        risk_count = sum(1 for keyword in risk_keywords if keyword.lower() in text.lower())
+        risk_count = len(self._keyword_hits(text) & _RISK_KEYWORD_SET)
         
         if risk_count > 10:
             return "HIGH - Multiple risk-related terms detected"
@@ -349,77 +966,69 @@ class AIProcessor:
     
     def _detect_document_type(self, text: str) -> str:
         """Detect type of document"""
-        text_lower = text.lower()
+        hits = self._keyword_hits(text)
         
-        if any(term in text_lower for term in ["employment", "employee", "employer", "job"]):
-            return "Employment Agreement"
-        elif any(term in text_lower for term in ["non-disclosure", "nda", "confidential"]):
-            return "Non-Disclosure Agreement"
-        elif any(term in text_lower for term in ["service", "services", "provider"]):
-            return "Service Agreement"
-        elif any(term in text_lower for term in ["partnership", "partner", "joint venture"]):
-            return "Partnership Agreement"
-        elif any(term in text_lower for term in ["sale", "purchase", "buy", "sell"]):
-            return "Sales Agreement"
-        else:
-            return "Legal Document"
+        for doc_type, markers in DOCUMENT_TYPE_MARKERS:
+            if not hits.isdisjoint(markers):
+                return doc_type
+        return "Legal Document"
     
     def _extract_simple_entities(self, text: str) -> List[str]:
         """Extract simple entities using regex"""
-        entities = []
-        
-        # Find potential company names (capitalized words)
-        company_pattern = r'\b[A-Z][a-z]+ (?:Inc|LLC|Corp|Corporation|Company|Ltd)\b'
-        companies = re.findall(company_pattern, text)
-        entities.extend(companies[:3])
+        # Company names (capitalized words), dates and monetary amounts in one pass
+        buckets = {kind: [] for kind in ENTITY_LIMITS}
+        remaining = sum(ENTITY_LIMITS.values())
         
-        # Find dates
-        date_pattern = r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'
-        dates = re.findall(date_pattern, text)
-        entities.extend(dates[:2])
+        for match in _ENTITY_RE.finditer(text):
+            bucket = buckets[match.lastgroup]
+            if len(bucket) < ENTITY_LIMITS[match.lastgroup]:
+                bucket.append(match.group())
+                remaining -= 1
+                if remaining == 0:
+                    break
         
-        # Find monetary amounts
-        money_pattern = r'\$[\d,]+(?:\.\d{2})?'
-        amounts = re.findall(money_pattern, text)
-        entities.extend(amounts[:2])
-        
-        return entities
+        return [entity for kind in ENTITY_LIMITS for entity in buckets[kind]]
     
     def _simple_question_answer(self, text: str, question: str) -> str:
         """Fallback simple question answering"""
         question_lower = question.lower()
-        text_lower = text.lower()
         
         # Simple keyword matching
         question_words = question_lower.split()
-        relevant_sentences = []
         
-        for sentence in text.split('.'):
+        # Stop at the first relevant sentence instead of splitting the whole document
+        for sentence in _iter_sentences(text):
             sentence_lower = sentence.lower()
             if any(word in sentence_lower for word in question_words):
-                relevant_sentences.append(sentence.strip())
+                return sentence.strip()
         
-        if relevant_sentences:
-            return relevant_sentences[0]
-        else:
-            return "I couldn't find specific information related to your question in the document."
+        return "I couldn't find specific information related to your question in the document."
     
     def _find_risk_indicators(self, text: str) -> List[str]:
         """Find risk indicators in text"""
-        risk_patterns = {
-            "Unlimited Liability": r"unlimited.*liability",
-            "Personal Guarantee": r"personal.*guarantee",
-            "Automatic Renewal": r"automatic.*renew",
-            "Liquidated Damages": r"liquidated.*damages",
-            "Non-Compete": r"non.?compete",
-            "Exclusive Dealing": r"exclusive.*dealing"
-        }
-        
-        found_risks = []
-        text_lower = text.lower()
+        found = set()
         
-        for risk_name, pattern in risk_patterns.items():
-            if re.search(pattern, text_lower):
-                found_risks.append(risk_name)
+        # Single pass over the document for all patterns
+        for match in _RISK_RE.finditer(self._lower(text)):
+            found.add(_RISK_GROUPS[match.lastgroup])
+            if len(found) == len(RISK_PATTERNS):
+                break
         
-        return found_risks
\ No newline at end of file
+        return [risk_name for risk_name in RISK_PATTERNS if risk_name in found]
+
+
+_processor = None
+_processor_lock = threading.Lock()
+
+def get_ai_processor() -> AIProcessor:
+    """
+    Process-wide AIProcessor, created on first call
+    
+    Every caller shares one set of loaded models instead of each instance
+    loading its own copy.
+    """
+    global _processor
+    with _processor_lock:
+        if _processor is None:
+            _processor = AIProcessor()
+        return _processor
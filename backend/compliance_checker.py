@@ -1,148 +1,436 @@
 import logging
 import re
-from typing import Dict, List, Tuple
+import threading
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
 import json
 
+import numpy as np
+
+from keyword_matcher import KeywordMatcher
+
+# Intel Hyperscan multi-pattern engine (optional)
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 logger = logging.getLogger(__name__)
 
-class ComplianceChecker:
+# Escapes that can match a '.', and their sentence-bound replacements
+_DOT_MATCHING_ESCAPES = {r"\.": "(?!)", r"\W": r"[^\w.]", r"\S": r"[^\s.]", r"\D": r"[^\d.]"}
+
+def _within_sentence(pattern: str) -> str:
     """
-    Compliance checker for legal documents
+    Rewrite a regex so it never matches a '.', i.e. never crosses the sentence
+    boundaries used by text.split('.'). A match of the result therefore lies
+    inside a single sentence, which lets one finditer over the whole document
+    find exactly the sentences that a per-sentence search would.
+    """
+    parts = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            token = pattern[i:i + 2]
+            i += 2
+            if in_class:
+                if token != r"\.":
+                    parts.append(token)
+            else:
+                parts.append(_DOT_MATCHING_ESCAPES.get(token, token))
+            continue
+        
+        i += 1
+        if in_class:
+            if char == "]":
+                in_class = False
+            elif char == ".":
+                continue
+        elif char == "[":
+            in_class = True
+        elif char == ".":
+            # Any character except newline (as before) and the sentence separator
+            char = r"[^.\n]"
+        parts.append(char)
+    return "".join(parts)
+
+# Compliance rules and regulations
+COMPLIANCE_RULES = {
+    "GDPR": {
+        "required_terms": [
+            "data protection", "personal data", "data subject rights",
+            "consent", "data processor", "data controller"
+        ],
+        "prohibited_terms": [
+            "unlimited data retention", "no data subject rights"
+        ],
+        "risk_indicators": [
+            "automatic data processing", "profiling", "sensitive data"
+        ]
+    },
+    "CCPA": {
+        "required_terms": [
+            "california consumer privacy act", "personal information",
+            "consumer rights", "opt-out", "data deletion"
+        ],
+        "prohibited_terms": [
+            "no consumer rights", "mandatory data sharing"
+        ],
+        "risk_indicators": [
+            "sale of personal information", "third-party sharing"
+        ]
+    },
+    "SOX": {
+        "required_terms": [
+            "financial disclosure", "internal controls", "audit",
+            "financial reporting", "compliance certification"
+        ],
+        "prohibited_terms": [
+            "no financial oversight", "unrestricted access"
+        ],
+        "risk_indicators": [
+            "related party transactions", "off-balance sheet"
+        ]
+    },
+    "HIPAA": {
+        "required_terms": [
+            "protected health information", "phi", "business associate",
+            "minimum necessary", "security safeguards"
+        ],
+        "prohibited_terms": [
+            "unrestricted phi access", "no security measures"
+        ],
+        "risk_indicators": [
+            "phi disclosure", "unsecured transmission"
+        ]
+    }
+}
+
+# Weighted risk terms for risk scoring
+RISK_FACTORS = {
+    "high_risk": {
+        "terms": [
+            "unlimited liability", "personal guarantee", "liquidated damages",
+            "automatic renewal", "non-compete", "exclusive dealing",
+            "penalty clause", "forfeiture"
+        ],
+        "weight": 3
+    },
+    "medium_risk": {
+        "terms": [
+            "indemnification", "force majeure", "intellectual property",
+            "confidentiality breach", "termination for convenience",
+            "governing law", "arbitration mandatory"
+        ],
+        "weight": 2
+    },
+    "low_risk": {
+        "terms": [
+            "standard warranty", "mutual agreement", "reasonable notice",
+            "good faith", "best efforts", "industry standard"
+        ],
+        "weight": 1
+    }
+}
+
+# Clause pattern matches reported per clause type; the pattern part of the
+# confidence score saturates at this count, so later matches are never needed
+MAX_CLAUSE_MATCHES = 3
+
+# Patterns for clause detection
+CLAUSE_PATTERNS = {
+    "termination": {
+        "patterns": [
+            r"terminat\w+",
+            r"end\s+(?:this\s+)?agreement",
+            r"expir\w+",
+            r"dissolv\w+",
+            r"breach.*terminat\w+"
+        ],
+        "keywords": ["terminate", "termination", "end", "expire", "dissolution"]
+    },
+    "liability": {
+        "patterns": [
+            r"liabilit\w+",
+            r"liable\s+for",
+            r"damages",
+            r"indemnif\w+",
+            r"limitation\s+of\s+liability"
+        ],
+        "keywords": ["liability", "liable", "damages", "indemnify", "limitation"]
+    },
+    "payment": {
+        "patterns": [
+            r"payment\s+terms",
+            r"invoice\w*",
+            r"fee\s+schedule",
+            r"compensation",
+            r"\$[\d,]+(?:\.\d{2})?"
+        ],
+        "keywords": ["payment", "invoice", "fee", "compensation", "cost"]
+    },
+    "confidentiality": {
+        "patterns": [
+            r"confidential\w*",
+            r"non.?disclosure",
+            r"proprietary\s+information",
+            r"trade\s+secret\w*",
+            r"confidentiality\s+agreement"
+        ],
+        "keywords": ["confidential", "non-disclosure", "proprietary", "trade secret"]
+    },
+    "intellectual_property": {
+        "patterns": [
+            r"intellectual\s+property",
+            r"copyright\w*",
+            r"trademark\w*",
+            r"patent\w*",
+            r"trade\s+secret\w*"
+        ],
+        "keywords": ["intellectual property", "copyright", "trademark", "patent"]
+    },
+    "dispute_resolution": {
+        "patterns": [
+            r"dispute\s+resolution",
+            r"arbitration",
+            r"mediation",
+            r"governing\s+law",
+            r"jurisdiction"
+        ],
+        "keywords": ["dispute", "arbitration", "mediation", "governing law"]
+    },
+    "force_majeure": {
+        "patterns": [
+            r"force\s+majeure",
+            r"act\s+of\s+god",
+            r"unforeseeable\s+circumstances",
+            r"beyond\s+reasonable\s+control"
+        ],
+        "keywords": ["force majeure", "act of god", "unforeseeable"]
+    }
+}
+
+def _compile_clause_patterns(clause_patterns: Dict) -> Dict:
+    """Copy of the clause patterns with their compiled forms added"""
+    compiled_patterns = {}
+    for clause_type, data in clause_patterns.items():
+        patterns_data = dict(data)
+        patterns_data["compiled"] = [re.compile(pattern, re.IGNORECASE) for pattern in patterns_data["patterns"]]
+        # All patterns of the clause type in one alternation, scanned once per document
+        patterns_data["combined"] = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in patterns_data["patterns"]),
+            re.IGNORECASE
+        )
+        # Same alternation restricted to single sentences, for extract_specific_clauses
+        patterns_data["sentence"] = re.compile(
+            "|".join(f"(?:{_within_sentence(pattern)})" for pattern in patterns_data["patterns"]),
+            re.IGNORECASE
+        )
+        compiled_patterns[clause_type] = patterns_data
+    return compiled_patterns
+
+def _build_term_index(clauses: bool = False) -> Dict[str, List[Tuple[str, str, str]]]:
     """
+    Map each lowercased literal term to the (category, subkey, term) entries
+    using it: regulation and risk terms, or with clauses=True clause keywords
+    """
+    term_index = {}
     
-    def __init__(self):
-        self.compliance_rules = self._load_compliance_rules()
-        self.clause_patterns = self._load_clause_patterns()
-        logger.info("ComplianceChecker initialized")
+    def add_term(category: str, subkey: str, term: str):
+        term_index.setdefault(term.lower(), []).append((category, subkey, term))
+    
+    if clauses:
+        for clause_type, patterns_data in CLAUSE_PATTERNS.items():
+            for keyword in patterns_data["keywords"]:
+                add_term("clauses", clause_type, keyword)
+        return term_index
     
-    def _load_compliance_rules(self) -> Dict:
-        """Load compliance rules and regulations"""
+    for regulation, rules in COMPLIANCE_RULES.items():
+        for bucket in ("required_terms", "prohibited_terms", "risk_indicators"):
+            for term in rules.get(bucket, []):
+                add_term(regulation, bucket, term)
+    for risk_level, data in RISK_FACTORS.items():
+        for term in data["terms"]:
+            add_term("risk", risk_level, term)
+    return term_index
+
+def _build_clause_prefilter():
+    """
+    Compile every clause pattern into one Hyperscan database
+    
+    Returns:
+        (database, pattern id -> clause type), or None without hyperscan
+    """
+    if hyperscan is None:
+        return None
+    
+    expressions, clause_ids = [], []
+    for clause_type, patterns_data in CLAUSE_PATTERNS.items():
+        for pattern in patterns_data["patterns"]:
+            expressions.append(pattern.encode())
+            clause_ids.append(clause_type)
+    
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    try:
+        database = hyperscan.Database()
+        database.compile(expressions=expressions, ids=list(range(len(expressions))), flags=[flags] * len(expressions))
+    except Exception as e:
+        logger.warning(f"Hyperscan unavailable for clause patterns, using re only: {str(e)}")
+        return None
+    return database, clause_ids
+
+@dataclass(slots=True)
+class RegulationResult:
+    """Terms of one regulation found in a document, and its score"""
+    regulation: str
+    score: float = 0
+    found_requirements: List[str] = field(default_factory=list)
+    missing_requirements: List[str] = field(default_factory=list)
+    risk_factors: List[str] = field(default_factory=list)
+    prohibited_found: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict:
+        return {
+            "regulation": self.regulation,
+            "score": self.score,
+            "found_requirements": self.found_requirements,
+            "missing_requirements": self.missing_requirements,
+            "risk_factors": self.risk_factors,
+            "prohibited_found": self.prohibited_found
+        }
+
+@dataclass(slots=True)
+class ComplianceResult:
+    """Combined compliance result of a document"""
+    overall_score: float
+    regulations: Dict[str, RegulationResult]
+    missing_requirements: List[str]
+    risk_factors: List[str]
+    recommendations: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict:
         return {
-            "GDPR": {
-                "required_terms": [
-                    "data protection", "personal data", "data subject rights",
-                    "consent", "data processor", "data controller"
-                ],
-                "prohibited_terms": [
-                    "unlimited data retention", "no data subject rights"
-                ],
-                "risk_indicators": [
-                    "automatic data processing", "profiling", "sensitive data"
-                ]
-            },
-            "CCPA": {
-                "required_terms": [
-                    "california consumer privacy act", "personal information",
-                    "consumer rights", "opt-out", "data deletion"
-                ],
-                "prohibited_terms": [
-                    "no consumer rights", "mandatory data sharing"
-                ],
-                "risk_indicators": [
-                    "sale of personal information", "third-party sharing"
-                ]
-            },
-            "SOX": {
-                "required_terms": [
-                    "financial disclosure", "internal controls", "audit",
-                    "financial reporting", "compliance certification"
-                ],
-                "prohibited_terms": [
-                    "no financial oversight", "unrestricted access"
-                ],
-                "risk_indicators": [
-                    "related party transactions", "off-balance sheet"
-                ]
-            },
-            "HIPAA": {
-                "required_terms": [
-                    "protected health information", "phi", "business associate",
-                    "minimum necessary", "security safeguards"
-                ],
-                "prohibited_terms": [
-                    "unrestricted phi access", "no security measures"
-                ],
-                "risk_indicators": [
-                    "phi disclosure", "unsecured transmission"
-                ]
-            }
+            "overall_score": self.overall_score,
+            "regulations": {name: result.to_dict() for name, result in self.regulations.items()},
+            "missing_requirements": self.missing_requirements,
+            "risk_factors": self.risk_factors,
+            "recommendations": self.recommendations
         }
+
+@dataclass(slots=True)
+class ClauseResult:
+    """Detection result of one clause type"""
+    found: bool
+    matches: List[Dict]
+    keywords_found: List[str]
+    confidence: float
     
-    def _load_clause_patterns(self) -> Dict:
-        """Load patterns for clause detection"""
+    def to_dict(self) -> Dict:
         return {
-            "termination": {
-                "patterns": [
-                    r"terminat\w+",
-                    r"end\s+(?:this\s+)?agreement",
-                    r"expir\w+",
-                    r"dissolv\w+",
-                    r"breach.*terminat\w+"
-                ],
-                "keywords": ["terminate", "termination", "end", "expire", "dissolution"]
-            },
-            "liability": {
-                "patterns": [
-                    r"liabilit\w+",
-                    r"liable\s+for",
-                    r"damages",
-                    r"indemnif\w+",
-                    r"limitation\s+of\s+liability"
-                ],
-                "keywords": ["liability", "liable", "damages", "indemnify", "limitation"]
-            },
-            "payment": {
-                "patterns": [
-                    r"payment\s+terms",
-                    r"invoice\w*",
-                    r"fee\s+schedule",
-                    r"compensation",
-                    r"\$[\d,]+(?:\.\d{2})?"
-                ],
-                "keywords": ["payment", "invoice", "fee", "compensation", "cost"]
-            },
-            "confidentiality": {
-                "patterns": [
-                    r"confidential\w*",
-                    r"non.?disclosure",
-                    r"proprietary\s+information",
-                    r"trade\s+secret\w*",
-                    r"confidentiality\s+agreement"
-                ],
-                "keywords": ["confidential", "non-disclosure", "proprietary", "trade secret"]
-            },
-            "intellectual_property": {
-                "patterns": [
-                    r"intellectual\s+property",
-                    r"copyright\w*",
-                    r"trademark\w*",
-                    r"patent\w*",
-                    r"trade\s+secret\w*"
-                ],
-                "keywords": ["intellectual property", "copyright", "trademark", "patent"]
-            },
-            "dispute_resolution": {
-                "patterns": [
-                    r"dispute\s+resolution",
-                    r"arbitration",
-                    r"mediation",
-                    r"governing\s+law",
-                    r"jurisdiction"
-                ],
-                "keywords": ["dispute", "arbitration", "mediation", "governing law"]
-            },
-            "force_majeure": {
-                "patterns": [
-                    r"force\s+majeure",
-                    r"act\s+of\s+god",
-                    r"unforeseeable\s+circumstances",
-                    r"beyond\s+reasonable\s+control"
-                ],
-                "keywords": ["force majeure", "act of god", "unforeseeable"]
-            }
+            "found": self.found,
+            "matches": self.matches,
+            "keywords_found": self.keywords_found,
+            "confidence": self.confidence
         }
+
+@dataclass(slots=True)
+class RiskResult:
+    """Risk score of a document and the risk terms behind it"""
+    overall_score: float
+    risk_level: str
+    factors_found: Dict[str, List[str]]
+    recommendations: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict:
+        return {
+            "overall_score": self.overall_score,
+            "risk_level": self.risk_level,
+            "factors_found": self.factors_found,
+            "recommendations": self.recommendations
+        }
+
+# Everything derived from the rules is built once at import and shared by all
+# ComplianceChecker instances (treat it as read-only)
+_CLAUSE_PATTERNS_COMPILED = _compile_clause_patterns(CLAUSE_PATTERNS)
+
+# One automaton over the regulation and risk terms, matching whole words only
+# so "consent" is not found in "consented", and one over the clause keywords.
+# Those are stems ("terminate", "confidential") that must keep matching
+# inside longer words ("terminated", "confidentiality")
+_TERM_INDEX = _build_term_index()
+_TERM_MATCHER = KeywordMatcher(_TERM_INDEX, whole_words=True)
+_CLAUSE_KEYWORD_INDEX = _build_term_index(clauses=True)
+_CLAUSE_KEYWORD_MATCHER = KeywordMatcher(_CLAUSE_KEYWORD_INDEX)
+
+_CLAUSE_PREFILTER = _build_clause_prefilter()
+
+# Hyperscan scratch space is per thread; the database may be scanned concurrently
+_hyperscan_scratch = threading.local()
+
+class ComplianceChecker:
+    """
+    Compliance checker for legal documents
+    """
+    
+    def __init__(self):
+        self.compliance_rules = COMPLIANCE_RULES
+        self.clause_patterns = _CLAUSE_PATTERNS_COMPILED
+        self.risk_factors = RISK_FACTORS
+        logger.info("ComplianceChecker initialized")
+    
+    def scan(self, text: str) -> Dict[str, Dict[str, set]]:
+        """
+        Find every known literal term in the document
+        
+        Args:
+            text: Document text
+            
+        Returns:
+            Found terms as {category: {subkey: set of terms}}, where category is a
+            regulation name, "risk" (subkeys are risk levels) or "clauses"
+            (subkeys are clause types)
+        """
+        text_lower = text.lower()
+        
+        found = {}
+        for matcher, index in ((_TERM_MATCHER, _TERM_INDEX), (_CLAUSE_KEYWORD_MATCHER, _CLAUSE_KEYWORD_INDEX)):
+            for hit in matcher.find(text_lower):
+                for category, subkey, term in index[hit]:
+                    found.setdefault(category, {}).setdefault(subkey, set()).add(term)
+        return found
     
-    def check_compliance(self, text: str) -> Dict:
+    def _clause_types_present(self, text: str) -> Optional[set]:
+        """
+        Clause types with at least one pattern match, from a single Hyperscan pass
+        
+        Returns:
+            Set of clause types, or None when the prefilter is unavailable
+        """
+        if _CLAUSE_PREFILTER is None:
+            return None
+        database, clause_ids = _CLAUSE_PREFILTER
+        
+        scratch = getattr(_hyperscan_scratch, "scratch", None)
+        if scratch is None:
+            scratch = _hyperscan_scratch.scratch = hyperscan.Scratch(database)
+        
+        present = set()
+        total = len(self.clause_patterns)
+        
+        def on_match(pattern_id, start, end, flags, context):
+            present.add(clause_ids[pattern_id])
+            return len(present) == total  # stop once every clause type matched
+        
+        try:
+            database.scan(text.encode("utf-8", errors="replace"), match_event_handler=on_match, scratch=scratch)
+        except hyperscan.ScanTerminated:
+            pass  # raised when on_match stops the scan early
+        return present
+    
+    def check_compliance(self, text: str) -> ComplianceResult:
         """
         Check document compliance against multiple regulations
         
@@ -150,87 +438,156 @@ class ComplianceChecker:
             text: Document text
             
         Returns:
-            Compliance results dictionary
+            Compliance results (to_dict() gives the JSON form)
         """
-        results = {
-            "overall_score": 0,
-            "regulations": {},
-            "missing_requirements": [],
-            "risk_factors": [],
-            "recommendations": []
-        }
+        return self._run(text, list(self.compliance_rules))
+    
+    def check_specific_compliance(self, text: str, regulations: List[str]) -> ComplianceResult:
+        """
+        Check compliance against specific regulations
         
-        total_score = 0
-        regulation_count = 0
+        Args:
+            text: Document text
+            regulations: List of regulation names to check
+            
+        Returns:
+            Compliance results for specified regulations
+        """
+        regulations = [regulation for regulation in regulations if regulation in self.compliance_rules]
+        return self._run(text, regulations)
+    
+    def check_compliance_batch(self, texts: List[str], regulations: Optional[List[str]] = None) -> List[ComplianceResult]:
+        """
+        Check compliance of many documents, scoring all of them in one vectorized step
         
-        for regulation, rules in self.compliance_rules.items():
-            reg_result = self._check_single_regulation(text, regulation, rules)
-            results["regulations"][regulation] = reg_result
-            total_score += reg_result["score"]
-            regulation_count += 1
+        Args:
+            texts: Document texts
+            regulations: Regulation names to check (default: all)
             
-            # Collect missing requirements
-            results["missing_requirements"].extend(reg_result["missing_requirements"])
-            results["risk_factors"].extend(reg_result["risk_factors"])
+        Returns:
+            Compliance results for each document, as returned by check_specific_compliance
+        """
+        if regulations is None:
+            regulations = list(self.compliance_rules)
+        regulations = [regulation for regulation in regulations if regulation in self.compliance_rules]
         
-        # Calculate overall score
-        results["overall_score"] = total_score / regulation_count if regulation_count > 0 else 0
+        scan_results = [self.scan(text) for text in texts]
+        return [self._combine_results(results) for results in self._check_regulations(scan_results, regulations)]
+    
+    def _run(self, text: str, regulations: List[str]) -> ComplianceResult:
+        """
+        Check one document against regulations and combine the results
         
-        # Generate recommendations
-        results["recommendations"] = self._generate_recommendations(results)
+        The document is scanned once for the terms of every regulation.
+        
+        Args:
+            text: Document text
+            regulations: Regulation names, all present in compliance_rules
+            
+        Returns:
+            Combined compliance results
+        """
+        return self._combine_results(self._check_regulations([self.scan(text)], regulations)[0])
+    
+    def _check_regulations(self, scan_results: List[Dict], regulations: List[str]) -> List[List[RegulationResult]]:
+        """
+        Check documents against regulations
+        
+        Term matching is done per document; the scores of every (document,
+        regulation) pair are then computed together on a NumPy array.
+        
+        Args:
+            scan_results: scan() result of each document
+            regulations: Regulation names, all present in compliance_rules
+            
+        Returns:
+            For each document, the results of each regulation in order
+        """
+        results = [
+            [
+                self._check_single_regulation(scan_result.get(regulation, {}), regulation, self.compliance_rules[regulation])
+                for regulation in regulations
+            ]
+            for scan_result in scan_results
+        ]
+        
+        if results and regulations:
+            counts = np.array([
+                [[len(r.found_requirements), len(r.prohibited_found), len(r.risk_factors)] for r in document]
+                for document in results
+            ], dtype=np.float64)
+            required_counts = np.array(
+                [len(self.compliance_rules[regulation].get("required_terms", [])) for regulation in regulations],
+                dtype=np.float64
+            )
+            scores = self._score_regulations(counts, required_counts)
+            for document, document_scores in zip(results, scores.tolist()):
+                for result, score in zip(document, document_scores):
+                    result.score = score
         
         return results
     
-    def check_specific_compliance(self, text: str, regulations: List[str]) -> Dict:
+    @staticmethod
+    def _score_regulations(counts: np.ndarray, required_counts: np.ndarray) -> np.ndarray:
         """
-        Check compliance against specific regulations
+        Compliance scores from term counts
         
         Args:
-            text: Document text
-            regulations: List of regulation names to check
+            counts: Array of shape (documents, regulations, 3) holding the number of
+                found required terms, prohibited terms and risk indicators
+            required_counts: Number of required terms of each regulation
             
         Returns:
-            Compliance results for specified regulations
+            Array of shape (documents, regulations) with scores from 0 to 100
         """
-        results = {
-            "overall_score": 0,
-            "regulations": {},
-            "missing_requirements": [],
-            "risk_factors": [],
-            "recommendations": []
-        }
+        found, prohibited, risk = counts[..., 0], counts[..., 1], counts[..., 2]
+        penalty = prohibited * 0.2  # Penalty for prohibited terms
+        risk_penalty = risk * 0.1  # Penalty for risk factors
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            compliance_ratio = found / required_counts
+        scores = np.maximum(0, (compliance_ratio - penalty - risk_penalty) * 100)
+        
+        # No requirements to check
+        return np.where(required_counts > 0, scores, 100.0)
+    
+    def _combine_results(self, regulation_results: List[RegulationResult]) -> ComplianceResult:
+        """Combine per-regulation results into the overall compliance result"""
+        results = ComplianceResult(overall_score=0, regulations={}, missing_requirements=[], risk_factors=[])
         
         total_score = 0
         regulation_count = 0
         
-        for regulation in regulations:
-            if regulation in self.compliance_rules:
-                rules = self.compliance_rules[regulation]
-                reg_result = self._check_single_regulation(text, regulation, rules)
-                results["regulations"][regulation] = reg_result
-                total_score += reg_result["score"]
-                regulation_count += 1
-                
-                results["missing_requirements"].extend(reg_result["missing_requirements"])
-                results["risk_factors"].extend(reg_result["risk_factors"])
+        for reg_result in regulation_results:
+            results.regulations[reg_result.regulation] = reg_result
+            total_score += reg_result.score
+            regulation_count += 1
+            
+            # Collect missing requirements
+            results.missing_requirements.extend(reg_result.missing_requirements)
+            results.risk_factors.extend(reg_result.risk_factors)
         
-        results["overall_score"] = total_score / regulation_count if regulation_count > 0 else 0
-        results["recommendations"] = self._generate_recommendations(results)
+        # Calculate overall score
+        results.overall_score = total_score / regulation_count if regulation_count > 0 else 0
+        
+        # Generate recommendations
+        results.recommendations = self._generate_recommendations(results)
         
         return results
     
-    def _check_single_regulation(self, text: str, regulation: str, rules: Dict) -> Dict:
-        """Check compliance against a single regulation"""
-        text_lower = text.lower()
+    def _check_single_regulation(self, found_terms: Dict[str, set], regulation: str, rules: Dict) -> RegulationResult:
+        """
+        Find the terms of a single regulation; the score is filled in by _check_regulations
         
-        result = {
-            "regulation": regulation,
-            "score": 0,
-            "found_requirements": [],
-            "missing_requirements": [],
-            "risk_factors": [],
-            "prohibited_found": []
-        }
+        Args:
+            found_terms: Terms of this regulation found by scan(), by bucket
+            regulation: Regulation name
+            rules: Terms of the regulation
+            
+        Returns:
+            Result for the regulation
+        """
+        result = RegulationResult(regulation=regulation)
         
         # Check required terms
         required_terms = rules.get("required_terms", [])
@@ -238,47 +595,37 @@ class ComplianceChecker:
         missing_required = []
         
         for term in required_terms:
-            if term.lower() in text_lower:
+            if term in found_terms.get("required_terms", ()):
                 found_required.append(term)
             else:
                 missing_required.append(term)
         
-        result["found_requirements"] = found_required
-        result["missing_requirements"] = missing_required
+        result.found_requirements = found_required
+        result.missing_requirements = missing_required
         
         # Check prohibited terms
         prohibited_terms = rules.get("prohibited_terms", [])
         prohibited_found = []
         
         for term in prohibited_terms:
-            if term.lower() in text_lower:
+            if term in found_terms.get("prohibited_terms", ()):
                 prohibited_found.append(term)
         
-        result["prohibited_found"] = prohibited_found
+        result.prohibited_found = prohibited_found
         
         # Check risk indicators
         risk_indicators = rules.get("risk_indicators", [])
         risk_factors = []
         
         for indicator in risk_indicators:
-            if indicator.lower() in text_lower:
+            if indicator in found_terms.get("risk_indicators", ()):
                 risk_factors.append(indicator)
         
-        result["risk_factors"] = risk_factors
-        
-        # Calculate score
-        if required_terms:
-            compliance_ratio = len(found_required) / len(required_terms)
-            penalty = len(prohibited_found) * 0.2  # Penalty for prohibited terms
-            risk_penalty = len(risk_factors) * 0.1  # Penalty for risk factors
-            
-            result["score"] = max(0, (compliance_ratio - penalty - risk_penalty) * 100)
-        else:
-            result["score"] = 100  # No requirements to check
+        result.risk_factors = risk_factors
         
         return result
     
-    def detect_clauses(self, text: str) -> Dict:
+    def detect_clauses(self, text: str) -> Dict[str, ClauseResult]:
         """
         Detect and classify clauses in the document
         
@@ -286,51 +633,40 @@ class ComplianceChecker:
             text: Document text
             
         Returns:
-            Dictionary of detected clauses
+            Detection result of each clause type
         """
         detected_clauses = {}
+        found_keywords = self.scan(text).get("clauses", {})
+        
+        # Hyperscan tells which clause types match at all, so re only runs for those
+        present_types = self._clause_types_present(text)
         
         for clause_type, patterns_data in self.clause_patterns.items():
-            patterns = patterns_data["patterns"]
             keywords = patterns_data["keywords"]
             
-            clause_matches = []
-            
-            # Pattern matching
-            for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    # Get surrounding context
-                    start = max(0, match.start() - 50)
-                    end = min(len(text), match.end() + 50)
-                    context = text[start:end].strip()
-                    clause_matches.append({
-                        "match": match.group(),
-                        "context": context,
-                        "position": match.start()
-                    })
+            # Pattern matching: one scan for all patterns of the clause type,
+            # matches are reported in document order. The scan stops after the
+            # matches that are reported, however many the document contains.
+            if present_types is None or clause_type in present_types:
+                clause_matches = list(islice(patterns_data["combined"].finditer(text), MAX_CLAUSE_MATCHES))
+            else:
+                clause_matches = []
             
-            # Keyword matching for additional context
-            keyword_matches = []
-            text_lower = text.lower()
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    keyword_matches.append(keyword)
+            # Keyword matching for additional context, from the shared term scan
+            clause_keywords = found_keywords.get(clause_type)
+            keyword_matches = [keyword for keyword in keywords if keyword in clause_keywords] if clause_keywords else []
             
             if clause_matches or keyword_matches:
-                detected_clauses[clause_type] = {
-                    "found": True,
-                    "matches": clause_matches[:3],  # Limit to first 3 matches
-                    "keywords_found": keyword_matches,
-                    "confidence": self._calculate_clause_confidence(clause_matches, keyword_matches)
-                }
+                detected_clauses[clause_type] = ClauseResult(
+                    found=True,
+                    matches=[self._match_details(text, match) for match in clause_matches],
+                    keywords_found=keyword_matches,
+                    confidence=self._calculate_clause_confidence(
+                        self._pattern_match_count(text, patterns_data, clause_matches), keyword_matches
+                    )
+                )
             else:
-                detected_clauses[clause_type] = {
-                    "found": False,
-                    "matches": [],
-                    "keywords_found": [],
-                    "confidence": 0
-                }
+                detected_clauses[clause_type] = ClauseResult(found=False, matches=[], keywords_found=[], confidence=0)
         
         return detected_clauses
     
@@ -350,17 +686,20 @@ class ComplianceChecker:
         for clause_type in clause_types:
             if clause_type in self.clause_patterns:
                 patterns_data = self.clause_patterns[clause_type]
-                patterns = patterns_data["patterns"]
                 
                 clause_text = []
                 
-                # Find sentences containing clause patterns
-                sentences = text.split('.')
-                for sentence in sentences:
-                    for pattern in patterns:
-                        if re.search(pattern, sentence, re.IGNORECASE):
-                            clause_text.append(sentence.strip())
-                            break
+                # Find sentences containing clause patterns: one scan of the
+                # document, each match expanded to its '.'-delimited sentence
+                sentence_end = -1
+                for match in patterns_data["sentence"].finditer(text):
+                    if match.start() <= sentence_end:
+                        continue  # sentence already counted
+                    sentence_start = text.rfind('.', 0, match.start()) + 1
+                    sentence_end = text.find('.', match.start())
+                    if sentence_end == -1:
+                        sentence_end = len(text)
+                    clause_text.append(text[sentence_start:sentence_end].strip())
                 
                 extracted_clauses[clause_type] = {
                     "found": len(clause_text) > 0,
@@ -376,7 +715,7 @@ class ComplianceChecker:
         
         return extracted_clauses
     
-    def calculate_risk_score(self, text: str) -> Dict:
+    def calculate_risk_score(self, text: str) -> RiskResult:
         """
         Calculate overall risk score for the document
         
@@ -386,90 +725,86 @@ class ComplianceChecker:
         Returns:
             Risk score and analysis
         """
-        risk_factors = {
-            "high_risk": {
-                "terms": [
-                    "unlimited liability", "personal guarantee", "liquidated damages",
-                    "automatic renewal", "non-compete", "exclusive dealing",
-                    "penalty clause", "forfeiture"
-                ],
-                "weight": 3
-            },
-            "medium_risk": {
-                "terms": [
-                    "indemnification", "force majeure", "intellectual property",
-                    "confidentiality breach", "termination for convenience",
-                    "governing law", "arbitration mandatory"
-                ],
-                "weight": 2
-            },
-            "low_risk": {
-                "terms": [
-                    "standard warranty", "mutual agreement", "reasonable notice",
-                    "good faith", "best efforts", "industry standard"
-                ],
-                "weight": 1
-            }
-        }
-        
-        text_lower = text.lower()
-        risk_analysis = {
-            "overall_score": 0,
-            "risk_level": "LOW",
-            "factors_found": {
-                "high_risk": [],
-                "medium_risk": [],
-                "low_risk": []
-            },
-            "recommendations": []
-        }
+        found_risk_terms = self.scan(text).get("risk", {})
+        risk_analysis = RiskResult(
+            overall_score=0,
+            risk_level="LOW",
+            factors_found={"high_risk": [], "medium_risk": [], "low_risk": []}
+        )
         
         total_risk_score = 0
         
-        for risk_level, data in risk_factors.items():
-            terms = data["terms"]
-            weight = data["weight"]
-            found_terms = []
+        # The scan already found the terms, so each level's score is its weight
+        # times the number found; levels without hits skip the term lists
+        for risk_level, data in self.risk_factors.items():
+            level_found = found_risk_terms.get(risk_level)
+            found_terms = [term for term in data["terms"] if term in level_found] if level_found else []
+            total_risk_score += data["weight"] * len(found_terms)
             
-            for term in terms:
-                if term.lower() in text_lower:
-                    found_terms.append(term)
-                    total_risk_score += weight
-            
-            risk_analysis["factors_found"][risk_level] = found_terms
+            risk_analysis.factors_found[risk_level] = found_terms
         
         # Determine risk level
         if total_risk_score >= 15:
-            risk_analysis["risk_level"] = "HIGH"
+            risk_analysis.risk_level = "HIGH"
         elif total_risk_score >= 8:
-            risk_analysis["risk_level"] = "MEDIUM"
+            risk_analysis.risk_level = "MEDIUM"
         else:
-            risk_analysis["risk_level"] = "LOW"
+            risk_analysis.risk_level = "LOW"
         
-        risk_analysis["overall_score"] = min(100, total_risk_score * 5)  # Scale to 100
+        risk_analysis.overall_score = min(100, total_risk_score * 5)  # Scale to 100
         
         # Generate recommendations
-        risk_analysis["recommendations"] = self._generate_risk_recommendations(risk_analysis)
+        risk_analysis.recommendations = self._generate_risk_recommendations(risk_analysis)
         
         return risk_analysis
     
-    def _calculate_clause_confidence(self, clause_matches: List, keyword_matches: List) -> float:
+    def _match_details(self, text: str, match: re.Match) -> Dict:
+        """Matched text, surrounding context and position of a clause pattern match"""
+        # Get surrounding context
+        start = max(0, match.start() - 50)
+        end = min(len(text), match.end() + 50)
+        return {
+            "match": match.group(),
+            "context": text[start:end].strip(),
+            "position": match.start()
+        }
+    
+    def _pattern_match_count(self, text: str, patterns_data: Dict, clause_matches: List[re.Match]) -> int:
+        """
+        Number of matches of the clause type's patterns, each pattern counted
+        on its own, up to MAX_CLAUSE_MATCHES
+        
+        The combined alternation reports one match where patterns overlap
+        ("limitation of liability" and "liability"), so below the cap the
+        patterns are counted separately to keep the confidence score of
+        counting every pattern's matches.
+        """
+        if not clause_matches or len(clause_matches) >= MAX_CLAUSE_MATCHES:
+            return len(clause_matches)
+        count = 0
+        for pattern in patterns_data["compiled"]:
+            count += sum(1 for _ in islice(pattern.finditer(text), MAX_CLAUSE_MATCHES - count))
+            if count >= MAX_CLAUSE_MATCHES:
+                break
+        return count
+    
+    def _calculate_clause_confidence(self, pattern_matches: int, keyword_matches: List) -> float:
         """Calculate confidence score for clause detection"""
-        pattern_score = min(len(clause_matches) * 0.4, 1.0)
+        pattern_score = min(pattern_matches * 0.4, 1.0)
         keyword_score = min(len(keyword_matches) * 0.2, 0.6)
         return min(pattern_score + keyword_score, 1.0)
     
-    def _generate_recommendations(self, compliance_results: Dict) -> List[str]:
+    def _generate_recommendations(self, compliance_results: ComplianceResult) -> List[str]:
         """Generate compliance recommendations"""
         recommendations = []
         
-        if compliance_results["overall_score"] < 70:
+        if compliance_results.overall_score < 70:
             recommendations.append("Document requires significant compliance improvements")
         
-        if compliance_results["missing_requirements"]:
-            recommendations.append(f"Add missing compliance requirements: {', '.join(compliance_results['missing_requirements'][:3])}")
+        if compliance_results.missing_requirements:
+            recommendations.append(f"Add missing compliance requirements: {', '.join(compliance_results.missing_requirements[:3])}")
         
-        if compliance_results["risk_factors"]:
+        if compliance_results.risk_factors:
             recommendations.append("Review and address identified risk factors")
         
         if not recommendations:
@@ -477,15 +812,15 @@ class ComplianceChecker:
         
         return recommendations
     
-    def _generate_risk_recommendations(self, risk_analysis: Dict) -> List[str]:
+    def _generate_risk_recommendations(self, risk_analysis: RiskResult) -> List[str]:
         """Generate risk-based recommendations"""
         recommendations = []
         
-        if risk_analysis["risk_level"] == "HIGH":
+        if risk_analysis.risk_level == "HIGH":
             recommendations.append("High-risk document requires legal review before execution")
             recommendations.append("Consider negotiating terms to reduce liability exposure")
         
-        elif risk_analysis["risk_level"] == "MEDIUM":
+        elif risk_analysis.risk_level == "MEDIUM":
             recommendations.append("Medium-risk document should be reviewed by legal counsel")
             recommendations.append("Ensure adequate insurance coverage for identified risks")
         
@@ -494,7 +829,7 @@ class ComplianceChecker:
             recommendations.append("Periodic review recommended for ongoing compliance")
         
         # Specific recommendations based on found factors
-        if risk_analysis["factors_found"]["high_risk"]:
+        if risk_analysis.factors_found["high_risk"]:
             recommendations.append("Pay special attention to high-risk clauses identified")
         
         return recommendations
\ No newline at end of file
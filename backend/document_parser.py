@@ -1,7 +1,15 @@
 import os
+import contextlib
+import functools
+import io
 import logging
+import mmap
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, List, Optional, Union
 
 # Document processing libraries
 try:
@@ -15,12 +23,82 @@ except ImportError:
     Document = None
 
 try:
-    import pdfplumber  # Alternative PDF processor
+    import pdfplumber  # Optional fallback PDF processor (pdfminer-based, much slower)
 except ImportError:
     pdfplumber = None
 
+try:
+    from lxml import etree  # Streaming DOCX parsing (installed with python-docx)
+except ImportError:
+    etree = None
+
 logger = logging.getLogger(__name__)
 
+# PDFs with at least this many pages are extracted by a pool of worker
+# processes, each handling one contiguous page range
+PARALLEL_PAGE_THRESHOLD = 32
+PDF_WORKERS = min(8, os.cpu_count() or 1)
+
+# PDFs larger than this are memory-mapped for the pdfplumber fallback instead
+# of read through file I/O
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# WordprocessingML elements read when streaming word/document.xml
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_SEPARATORS = {f"{_W}tab": "\t", f"{_W}br": "\n", f"{_W}cr": "\n"}
+_DOCX_TAGS = [f"{_W}t", f"{_W}p", f"{_W}tbl", f"{_W}tr", f"{_W}tc", *_DOCX_SEPARATORS]
+
+# Number of files whose extracted text and metadata are kept in memory
+PARSE_CACHE_SIZE = 128
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    """Worker processes for PDF extraction, started on first use"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            # Spawned workers don't inherit the server's threads or loaded models
+            _page_pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _page_pool
+
+def _map_file(file_path: str) -> Optional[mmap.mmap]:
+    """Read-only memory map of a large file, or None for small files or if mapping fails"""
+    if os.path.getsize(file_path) <= MMAP_THRESHOLD:
+        return None
+    try:
+        with open(file_path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not memory-map {file_path}: {str(e)}")
+        return None
+
+@contextlib.contextmanager
+def _open_pdf(source: Union[str, bytes]):
+    """
+    Open a PDF with PyMuPDF and close it on exit
+    
+    source is a file path or the PDF content. Paths are opened directly;
+    MuPDF reads objects from the file as pages are loaded.
+    """
+    if isinstance(source, bytes):
+        doc = fitz.open(stream=source, filetype="pdf")
+    else:
+        doc = fitz.open(source)
+    try:
+        yield doc
+    finally:
+        doc.close()
+
+def _extract_page_range(source: Union[str, bytes], start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) with a document handle owned by this worker"""
+    with _open_pdf(source) as doc:
+        return [doc.load_page(page_num).get_text() for page_num in range(start, stop)]
+
 class DocumentParser:
     """
     Document parser for extracting text from various file formats
@@ -28,12 +106,20 @@ class DocumentParser:
     
     def __init__(self):
         self.supported_formats = {'.pdf', '.doc', '.docx'}
+        
+        # Per-instance caches keyed by (path, mtime_ns, size, ...). Rewriting a
+        # file changes its mtime or size, so stale entries are never returned.
+        self._extract_text_cached = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(self._extract_text_uncached)
+        self._metadata_cached = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(self._read_metadata)
         logger.info("DocumentParser initialized")
     
     def extract_text(self, file_path: str, file_extension: str) -> str:
         """
         Extract text from document based on file extension
         
+        Results are cached by (path, modification time, size), so extracting an
+        unchanged file again is a lookup. Modifying the file invalidates its entry.
+        
         Args:
             file_path: Path to the document file
             file_extension: File extension (.pdf, .doc, .docx)
@@ -42,31 +128,71 @@ class DocumentParser:
             Extracted text content
         """
         try:
-            if file_extension.lower() == '.pdf':
-                return self._extract_pdf_text(file_path)
-            elif file_extension.lower() in ['.doc', '.docx']:
-                return self._extract_docx_text(file_path)
+            stat = os.stat(file_path)
+            return self._extract_text_cached(file_path, stat.st_mtime_ns, stat.st_size, file_extension.lower())
+        
+        except Exception as e:
+            logger.error(f"Error extracting text from {file_path}: {str(e)}")
+            raise
+    
+    def extract_text_from_bytes(self, data: bytes, file_extension: str) -> str:
+        """
+        Extract text from a document held in memory, without writing it to disk
+        
+        Args:
+            data: Document content
+            file_extension: File extension (.pdf, .doc, .docx)
+            
+        Returns:
+            Extracted text content
+        """
+        file_extension = file_extension.lower()
+        try:
+            if file_extension == '.pdf':
+                return self._extract_pdf_text(data)
+            elif file_extension in ['.doc', '.docx']:
+                return self._extract_docx_text(io.BytesIO(data))
             else:
                 raise ValueError(f"Unsupported file format: {file_extension}")
         
         except Exception as e:
-            logger.error(f"Error extracting text from {file_path}: {str(e)}")
+            logger.error(f"Error extracting text from {file_extension} content: {str(e)}")
             raise
     
-    def _extract_pdf_text(self, file_path: str) -> str:
+    def _extract_text_uncached(self, file_path: str, mtime_ns: int, size: int, file_extension: str) -> str:
+        """Extract text; mtime_ns and size only key the cache"""
+        if file_extension == '.pdf':
+            return self._extract_pdf_text(file_path)
+        elif file_extension in ['.doc', '.docx']:
+            return self._extract_docx_text(file_path)
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+    
+    def _extract_pdf_text(self, source: Union[str, bytes]) -> str:
         """
         Extract text from PDF using PyMuPDF (primary) or pdfplumber (fallback)
+        
+        Args:
+            source: Path to the PDF, or its content
         """
         text = ""
         
+        # Pages are collected in a list and joined once; repeated += would copy
+        # the accumulated text for every page
+        
         # Try PyMuPDF first
         if fitz:
             try:
-                doc = fitz.open(file_path)
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    text += page.get_text()
-                doc.close()
+                with _open_pdf(source) as doc:
+                    page_count = len(doc)
+                    parallel = page_count >= PARALLEL_PAGE_THRESHOLD and PDF_WORKERS > 1
+                    if not parallel:
+                        parts = [None] * page_count
+                        for page_num in range(page_count):
+                            parts[page_num] = doc.load_page(page_num).get_text()
+                if parallel:
+                    parts = self._extract_pdf_pages_parallel(source, page_count)
+                text = "".join(parts)
                 logger.info(f"Successfully extracted text from PDF using PyMuPDF: {len(text)} characters")
                 return text
             except Exception as e:
@@ -75,11 +201,23 @@ class DocumentParser:
         # Fallback to pdfplumber
         if pdfplumber:
             try:
-                with pdfplumber.open(file_path) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
+                if isinstance(source, bytes):
+                    mapped, pdf_input = None, io.BytesIO(source)
+                else:
+                    mapped = _map_file(source)
+                    pdf_input = mapped if mapped is not None else source
+                try:
+                    with pdfplumber.open(pdf_input) as pdf:
+                        parts = []
+                        for page in pdf.pages:
+                            page_text = page.extract_text()
+                            if page_text:
+                                parts.append(page_text)
+                                parts.append("\n")
+                finally:
+                    if mapped is not None:
+                        mapped.close()
+                text = "".join(parts)
                 logger.info(f"Successfully extracted text from PDF using pdfplumber: {len(text)} characters")
                 return text
             except Exception as e:
@@ -91,27 +229,63 @@ class DocumentParser:
         
         return text
     
-    def _extract_docx_text(self, file_path: str) -> str:
+    def _extract_pdf_pages_parallel(self, source: Union[str, bytes], page_count: int) -> List[str]:
         """
-        Extract text from DOC/DOCX files using python-docx
+        Extract PDF pages in worker processes, keeping page order
+        
+        PyMuPDF documents are not thread-safe and get_text() holds the GIL, so
+        pages are split into one contiguous range per process and every worker
+        opens its own handle to the document. In-memory content is sent to
+        each worker once, with its page range.
         """
+        chunk_size = -(-page_count // PDF_WORKERS)
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+        
+        pool = _get_page_pool()
+        futures = [pool.submit(_extract_page_range, source, start, stop) for start, stop in ranges]
+        
+        parts = []
+        for future in futures:
+            parts.extend(future.result())
+        return parts
+    
+    def _extract_docx_text(self, source: Union[str, BinaryIO]) -> str:
+        """
+        Extract text from DOC/DOCX files by streaming word/document.xml, with
+        python-docx as the fallback
+        
+        Args:
+            source: Path to the document, or a binary file object with its content
+        """
+        if etree is not None:
+            try:
+                text = self._stream_docx_text(source)
+                logger.info(f"Successfully extracted text from DOCX: {len(text)} characters")
+                return text
+            except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+                logger.warning(f"Streaming DOCX parse failed: {str(e)}, trying python-docx")
+        
         if not Document:
             raise Exception("python-docx not available. Cannot process DOC/DOCX files.")
         
         try:
-            doc = Document(file_path)
-            text = ""
+            doc = Document(source)
+            parts = []
             
             # Extract text from paragraphs
             for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+                parts.append(paragraph.text)
+                parts.append("\n")
             
             # Extract text from tables
             for table in doc.tables:
                 for row in table.rows:
                     for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
+                        parts.append(cell.text)
+                        parts.append(" ")
+                    parts.append("\n")
+            
+            text = "".join(parts)
             
             logger.info(f"Successfully extracted text from DOCX: {len(text)} characters")
             return text
@@ -120,6 +294,53 @@ class DocumentParser:
             logger.error(f"Error extracting text from DOCX: {str(e)}")
             raise Exception(f"Could not extract text from document: {str(e)}")
     
+    def _stream_docx_text(self, source: Union[str, BinaryIO]) -> str:
+        """
+        Extract DOCX text with lxml.iterparse, without building python-docx objects
+        
+        Follows the layout of the python-docx path (body paragraphs one per
+        line, followed by tables with each cell's text and a space, one row per
+        line) but not its exact output: a horizontally merged cell is written
+        once instead of once per grid column it spans, and text in textboxes,
+        content controls and tracked insertions is read from the XML as it
+        appears rather than as python-docx exposes it. Parsed elements are
+        discarded as soon as they are consumed.
+        """
+        body_parts = []
+        table_parts = []
+        table_depth = 0
+        
+        with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml_file:
+            for event, element in etree.iterparse(xml_file, events=("start", "end"), tag=_DOCX_TAGS):
+                tag = element.tag
+                if tag == f"{_W}tbl":
+                    table_depth += 1 if event == "start" else -1
+                if event == "start":
+                    continue
+                
+                parts = table_parts if table_depth else body_parts
+                if tag == f"{_W}t":
+                    parts.append(element.text or "")
+                elif tag in _DOCX_SEPARATORS:
+                    parts.append(_DOCX_SEPARATORS[tag])
+                elif tag == f"{_W}p":
+                    # Paragraphs within a cell are joined by newlines
+                    parts.append("\n")
+                elif tag == f"{_W}tc":
+                    if table_parts and table_parts[-1] == "\n":
+                        table_parts.pop()
+                    table_parts.append(" ")
+                elif tag == f"{_W}tr":
+                    table_parts.append("\n")
+                
+                # Free finished top-level blocks so memory stays flat
+                if tag in (f"{_W}p", f"{_W}tbl") and not table_depth:
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+        
+        return "".join(body_parts) + "".join(table_parts)
+    
     def validate_file(self, file_path: str, max_size_mb: int = 10) -> bool:
         """
         Validate file size and format
@@ -132,13 +353,14 @@ class DocumentParser:
             True if valid, False otherwise
         """
         try:
-            # Check if file exists
-            if not os.path.exists(file_path):
+            # Check that the file exists and get its size with a single stat()
+            try:
+                file_size = os.stat(file_path).st_size
+            except FileNotFoundError:
                 logger.error(f"File does not exist: {file_path}")
                 return False
             
             # Check file size
-            file_size = os.path.getsize(file_path)
             max_size_bytes = max_size_mb * 1024 * 1024
             
             if file_size > max_size_bytes:
@@ -161,29 +383,35 @@ class DocumentParser:
         """
         Extract metadata from document
         
+        Cached by (path, modification time, size) like extract_text.
+        
         Args:
             file_path: Path to document
             
         Returns:
             Dictionary containing metadata
         """
+        stat = os.stat(file_path)
+        return dict(self._metadata_cached(file_path, stat.st_mtime_ns, stat.st_size))
+    
+    def _read_metadata(self, file_path: str, mtime_ns: int, size: int) -> dict:
+        """Read metadata from the file; mtime_ns only keys the cache"""
         metadata = {
-            "file_size": os.path.getsize(file_path),
+            "file_size": size,
             "file_extension": Path(file_path).suffix.lower(),
             "file_name": Path(file_path).name
         }
         
         try:
             if metadata["file_extension"] == ".pdf" and fitz:
-                doc = fitz.open(file_path)
-                metadata.update({
-                    "page_count": len(doc),
-                    "title": doc.metadata.get("title", ""),
-                    "author": doc.metadata.get("author", ""),
-                    "subject": doc.metadata.get("subject", ""),
-                    "creator": doc.metadata.get("creator", "")
-                })
-                doc.close()
+                with _open_pdf(file_path) as doc:
+                    metadata.update({
+                        "page_count": len(doc),
+                        "title": doc.metadata.get("title", ""),
+                        "author": doc.metadata.get("author", ""),
+                        "subject": doc.metadata.get("subject", ""),
+                        "creator": doc.metadata.get("creator", "")
+                    })
             
             elif metadata["file_extension"] in [".doc", ".docx"] and Document:
                 doc = Document(file_path)
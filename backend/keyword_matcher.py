@@ -0,0 +1,116 @@
+import logging
+import re
+from typing import Iterable, Set
+
+# Aho-Corasick automaton (C extension)
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class KeywordMatcher:
+    """
+    Finds which of a fixed set of keywords occur in a text.
+
+    With pyahocorasick installed all keywords are matched in a single pass over
+    the text; otherwise each keyword falls back to a substring test, skipped
+    outright when the keyword uses a character absent from the text. Both modes
+    use plain substring semantics and are case-sensitive, so callers pass
+    lowercase keywords and lowercased text.
+
+    With whole_words=True a keyword only counts where it is not part of a
+    longer word ("consent" does not match "consented"). Without pyahocorasick
+    the text is then tokenized once, and keywords whose words are missing from
+    the token set are rejected with hash lookups.
+    """
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self.whole_words = whole_words
+        self._automaton = None
+        self._keyword_chars = None
+        self._keyword_words = None
+
+        if ahocorasick is not None and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+        elif ahocorasick is None:
+            logger.debug("pyahocorasick not available, using substring scans")
+            if whole_words:
+                self._keyword_words = [
+                    (keyword, frozenset(_WORD_RE.findall(keyword)), self._whole_word_pattern(keyword))
+                    for keyword in self.keywords
+                ]
+            else:
+                self._keyword_chars = [(keyword, frozenset(keyword)) for keyword in self.keywords]
+
+    @staticmethod
+    def _whole_word_pattern(keyword: str):
+        """Regex for keyword, or None when the keyword is a single word"""
+        if _WORD_RE.fullmatch(keyword):
+            return None
+        prefix = r"(?<!\w)" if _is_word_char(keyword[0]) else ""
+        suffix = r"(?!\w)" if _is_word_char(keyword[-1]) else ""
+        return re.compile(prefix + re.escape(keyword) + suffix)
+
+    def _is_whole_word(self, text: str, start: int, end: int) -> bool:
+        """Whether text[start:end] (a keyword) is not part of a longer word"""
+        if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+            return False
+        if end < len(text) and _is_word_char(text[end - 1]) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Find keywords present in text
+
+        Args:
+            text: Text to scan (already lowercased)
+
+        Returns:
+            Set of keywords that occur in the text
+        """
+        if self._automaton is None:
+            if self._keyword_words is not None:
+                return self._find_whole_words(text)
+            if not self._keyword_chars:
+                return set()
+            # One pass collects the characters of the text; most absent keywords
+            # are then rejected without scanning the text for them
+            present = set(text)
+            return {keyword for keyword, chars in self._keyword_chars if chars <= present and keyword in text}
+
+        found = set()
+        total = len(self.keywords)
+        for end, keyword in self._automaton.iter(text):
+            if keyword in found:
+                continue
+            if self.whole_words and not self._is_whole_word(text, end - len(keyword) + 1, end + 1):
+                continue
+            found.add(keyword)
+            if len(found) == total:
+                break
+        return found
+
+    def _find_whole_words(self, text: str) -> Set[str]:
+        """Fallback whole-word search over the token set of the text"""
+        tokens = set(_WORD_RE.findall(text))
+        found = set()
+        for keyword, words, pattern in self._keyword_words:
+            # Every word of a whole-word occurrence is also a token of the text
+            if not words <= tokens:
+                continue
+            if pattern is None or pattern.search(text):
+                found.add(keyword)
+        return found
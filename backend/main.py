@@ -1,18 +1,36 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
+import asyncio
+import hashlib
 import os
-import tempfile
 import shutil
-from pathlib import Path
+import uuid
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import json
 
+from cachetools import TTLCache
+
+# Faster hashing of uploads (optional)
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+# Faster JSON serialization of responses (optional)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ResponseClass = ORJSONResponse if orjson is not None else JSONResponse
+
 # Import our custom modules
 from document_parser import DocumentParser
-from ai_processor import AIProcessor
+from ai_processor import get_ai_processor, is_fallback
 from compliance_checker import ComplianceChecker
 
 # Configure logging
@@ -23,7 +41,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Contract IQ Document Analysis API",
     description="AI-powered document analysis and processing",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ResponseClass
 )
 
 # Configure CORS
@@ -35,18 +54,136 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses large enough to benefit (summaries, clause lists)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Initialize processors
 document_parser = DocumentParser()
-ai_processor = AIProcessor()
+ai_processor = get_ai_processor()
 compliance_checker = ComplianceChecker()
 
-# Create uploads directory
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
-
 # File size limit (10MB)
 MAX_FILE_SIZE = 10 * 1024 * 1024
 
+# Supported document types
+ALLOWED_EXTENSIONS = frozenset({'.pdf', '.doc', '.docx'})
+
+MAX_FILE_SIZE_MB = MAX_FILE_SIZE // (1024 * 1024)
+
+# Validation error messages, built once
+UNSUPPORTED_TYPE_DETAIL = f"Unsupported file type. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
+FILE_TOO_LARGE_DETAIL = f"File too large. Maximum size: {MAX_FILE_SIZE_MB}MB"
+
+# Validation errors. Each call builds a fresh exception so tracebacks and
+# context never leak between requests.
+def _no_file_error() -> HTTPException:
+    return HTTPException(status_code=400, detail="No file provided")
+
+def _unsupported_type_error() -> HTTPException:
+    return HTTPException(status_code=400, detail=UNSUPPORTED_TYPE_DETAIL)
+
+def _file_too_large_error() -> HTTPException:
+    return HTTPException(status_code=413, detail=FILE_TOO_LARGE_DETAIL)
+
+# Uploads are read in chunks of this size (1MB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Responses of recent requests, keyed by the upload's content hash and the
+# request parameters, so re-uploading a document skips parsing and inference
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL = 3600  # seconds
+result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+
+# Background analysis jobs (/jobs/...). At most MAX_CONCURRENT_JOBS run at a
+# time, so a burst of submissions queues up instead of competing for the
+# models; finished jobs are kept for JOB_TTL seconds.
+MAX_CONCURRENT_JOBS = int(os.getenv("CONTRACTIQ_MAX_JOBS", "2"))
+JOB_TTL = 3600
+jobs = TTLCache(maxsize=1024, ttl=JOB_TTL)
+job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+
+# How often idle GPU memory is handed back (seconds)
+GPU_RELEASE_INTERVAL = 60
+
+@app.on_event("startup")
+async def prewarm_models():
+    """Load AI models in the background so startup is not blocked by downloads"""
+    asyncio.get_running_loop().run_in_executor(None, ai_processor.prewarm)
+
+@app.on_event("startup")
+async def start_gpu_memory_release():
+    """Periodically release cached GPU memory while no analysis is running"""
+    if ai_processor.device != 0:
+        return
+    
+    async def release_when_idle():
+        while True:
+            await asyncio.sleep(GPU_RELEASE_INTERVAL)
+            if ai_processor.release_memory(min_idle_seconds=GPU_RELEASE_INTERVAL):
+                logger.debug("Released idle GPU memory")
+    
+    app.state.gpu_release_task = asyncio.create_task(release_when_idle())
+
+async def _read_upload(file: UploadFile) -> Tuple[bytes, str, bytes]:
+    """
+    Validate an upload and read it into memory
+    
+    The size limit is enforced while reading, so an oversized upload is
+    rejected without reading it in full. The content is hashed on the way.
+    
+    Args:
+        file: Uploaded document
+        
+    Returns:
+        (file content, file extension, content digest)
+    """
+    if not file.filename:
+        raise _no_file_error()
+    
+    # Check file extension
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise _unsupported_type_error()
+    
+    # The multipart parser has already spooled the upload and knows its size,
+    # so an oversized file is rejected without reading any of it
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise _file_too_large_error()
+    
+    chunks = []
+    total_size = 0
+    hasher = blake3() if blake3 is not None else hashlib.sha256()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total_size += len(chunk)
+        if total_size > MAX_FILE_SIZE:
+            raise _file_too_large_error()
+        hasher.update(chunk)
+        chunks.append(chunk)
+    
+    file_content = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    return file_content, file_extension, hasher.digest()
+
+def _cached_response(cache_key: tuple, filename: str) -> Optional[JSONResponse]:
+    """Response of an earlier identical request, if it is still cached"""
+    payload = result_cache.get(cache_key)
+    if payload is None:
+        return None
+    logger.info(f"Serving cached result for {filename}")
+    return ResponseClass({**payload, "filename": filename, "cache_hit": True})
+
+def _store_result(cache_key: tuple, payload: dict):
+    """
+    Cache a response payload, unless a model result in it is a degraded
+    fallback: those are retried on the next upload instead of being served
+    """
+    if not any(is_fallback(value) for value in payload.values()):
+        result_cache[cache_key] = payload
+
+def _cache_response(cache_key: tuple, payload: dict) -> JSONResponse:
+    """Cache a response payload and return it"""
+    _store_result(cache_key, payload)
+    return ResponseClass({**payload, "cache_hit": False})
+
 @app.get("/")
 async def root():
     return {"message": "Contract IQ Document Analysis API", "status": "running"}
@@ -55,6 +192,102 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "document-analysis"}
 
+async def _run_analysis(file_content: bytes, file_extension: str, filename: str,
+                        analysis_type: str, question: Optional[str]) -> dict:
+    """
+    Parse a document and analyze it
+    
+    Parsing and inference run in worker threads so the event loop keeps
+    serving other requests.
+    
+    Args:
+        file_content: Document content
+        file_extension: File extension (.pdf, .doc, .docx)
+        filename: Name of the uploaded file
+        analysis_type: Type of analysis (general, compliance, risk, clauses)
+        question: Optional specific question about the document
+        
+    Returns:
+        Response payload
+    """
+    # Parse document
+    logger.info(f"Parsing document: {filename}")
+    extracted_text = await asyncio.to_thread(document_parser.extract_text_from_bytes, file_content, file_extension)
+    
+    if not extracted_text.strip():
+        raise HTTPException(status_code=400, detail="Could not extract text from document")
+    
+    # Perform AI analysis; the rule-based check and the model run at the
+    # same time since neither needs the other's result
+    logger.info(f"Performing {analysis_type} analysis")
+    
+    if analysis_type == "compliance":
+        # Compliance-specific analysis
+        compliance_results, ai_analysis = await asyncio.gather(
+            asyncio.to_thread(compliance_checker.check_compliance, extracted_text),
+            asyncio.to_thread(ai_processor.analyze_compliance, extracted_text, question)
+        )
+        
+        return {
+            "success": True,
+            "filename": filename,
+            "analysis_type": analysis_type,
+            "analysis": ai_analysis,
+            "compliance_results": compliance_results.to_dict(),
+            "document_length": len(extracted_text),
+            "provider": "Hugging Face Transformers"
+        }
+    
+    elif analysis_type == "risk":
+        # Risk assessment
+        risk_analysis, risk_score = await asyncio.gather(
+            asyncio.to_thread(ai_processor.assess_risks, extracted_text, question),
+            asyncio.to_thread(compliance_checker.calculate_risk_score, extracted_text)
+        )
+        
+        return {
+            "success": True,
+            "filename": filename,
+            "analysis_type": analysis_type,
+            "analysis": risk_analysis,
+            "risk_score": risk_score.to_dict(),
+            "document_length": len(extracted_text),
+            "provider": "Hugging Face Transformers"
+        }
+    
+    elif analysis_type == "clauses":
+        # Clause detection and analysis
+        detected_clauses, clause_analysis = await asyncio.gather(
+            asyncio.to_thread(compliance_checker.detect_clauses, extracted_text),
+            asyncio.to_thread(ai_processor.analyze_clauses, extracted_text, question)
+        )
+        
+        return {
+            "success": True,
+            "filename": filename,
+            "analysis_type": analysis_type,
+            "analysis": clause_analysis,
+            "detected_clauses": {clause_type: result.to_dict() for clause_type, result in detected_clauses.items()},
+            "document_length": len(extracted_text),
+            "provider": "Hugging Face Transformers"
+        }
+    
+    else:
+        # General analysis. analyze_document summarizes the text itself, so the
+        # summary is requested after it and served from the summarizer cache
+        analysis_result = await asyncio.to_thread(ai_processor.analyze_document, extracted_text, question)
+        summary = await asyncio.to_thread(ai_processor.summarize_document, extracted_text)
+        
+        return {
+            "success": True,
+            "filename": filename,
+            "analysis_type": analysis_type,
+            "analysis": analysis_result,
+            "summary": summary,
+            "document_length": len(extracted_text),
+            "provider": "Hugging Face Transformers"
+        }
+
 @app.post("/analyze-document")
 async def analyze_document(
     file: UploadFile = File(...),
@@ -70,107 +303,16 @@ async def analyze_document(
         analysis_type: Type of analysis (general, compliance, risk, clauses)
     """
     try:
-        # Validate file
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="No file provided")
+        # Validate and read file
+        file_content, file_extension, digest = await _read_upload(file)
         
-        # Check file extension
-        allowed_extensions = {'.pdf', '.doc', '.docx'}
-        file_extension = Path(file.filename).suffix.lower()
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}"
-            )
+        cache_key = ("analyze-document", digest, analysis_type, question)
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
         
-        # Check file size
-        file_content = await file.read()
-        if len(file_content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
-            )
-        
-        # Save file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Parse document
-            logger.info(f"Parsing document: {file.filename}")
-            extracted_text = document_parser.extract_text(temp_file_path, file_extension)
-            
-            if not extracted_text.strip():
-                raise HTTPException(status_code=400, detail="Could not extract text from document")
-            
-            # Perform AI analysis
-            logger.info(f"Performing {analysis_type} analysis")
-            
-            if analysis_type == "compliance":
-                # Compliance-specific analysis
-                compliance_results = compliance_checker.check_compliance(extracted_text)
-                ai_analysis = ai_processor.analyze_compliance(extracted_text, question)
-                
-                return JSONResponse({
-                    "success": True,
-                    "filename": file.filename,
-                    "analysis_type": analysis_type,
-                    "analysis": ai_analysis,
-                    "compliance_results": compliance_results,
-                    "document_length": len(extracted_text),
-                    "provider": "Hugging Face Transformers"
-                })
-            
-            elif analysis_type == "risk":
-                # Risk assessment
-                risk_analysis = ai_processor.assess_risks(extracted_text, question)
-                risk_score = compliance_checker.calculate_risk_score(extracted_text)
-                
-                return JSONResponse({
-                    "success": True,
-                    "filename": file.filename,
-                    "analysis_type": analysis_type,
-                    "analysis": risk_analysis,
-                    "risk_score": risk_score,
-                    "document_length": len(extracted_text),
-                    "provider": "Hugging Face Transformers"
-                })
-            
-            elif analysis_type == "clauses":
-                # Clause detection and analysis
-                detected_clauses = compliance_checker.detect_clauses(extracted_text)
-                clause_analysis = ai_processor.analyze_clauses(extracted_text, question)
-                
-                return JSONResponse({
-                    "success": True,
-                    "filename": file.filename,
-                    "analysis_type": analysis_type,
-                    "analysis": clause_analysis,
-                    "detected_clauses": detected_clauses,
-                    "document_length": len(extracted_text),
-                    "provider": "Hugging Face Transformers"
-                })
-            
-            else:
-                # General analysis
-                analysis_result = ai_processor.analyze_document(extracted_text, question)
-                summary = ai_processor.summarize_document(extracted_text)
-                
-                return JSONResponse({
-                    "success": True,
-                    "filename": file.filename,
-                    "analysis_type": analysis_type,
-                    "analysis": analysis_result,
-                    "summary": summary,
-                    "document_length": len(extracted_text),
-                    "provider": "Hugging Face Transformers"
-                })
-        
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        payload = await _run_analysis(file_content, file_extension, file.filename, analysis_type, question)
+        return _cache_response(cache_key, payload)
     
     except HTTPException:
         raise
@@ -178,6 +320,94 @@ async def analyze_document(
         logger.error(f"Error analyzing document: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.post("/jobs/analyze-document", status_code=202)
+async def submit_analysis_job(
+    file: UploadFile = File(...),
+    question: Optional[str] = Form(None),
+    analysis_type: str = Form("general")
+):
+    """
+    Queue a document analysis and return immediately with a job id
+    
+    Takes the same form fields as /analyze-document. Poll GET /jobs/{job_id}
+    or connect to the WebSocket /jobs/{job_id}/ws to receive the result.
+    """
+    file_content, file_extension, digest = await _read_upload(file)
+    
+    job_id = uuid.uuid4().hex
+    job = {"job_id": job_id, "status": "queued", "result": None, "error": None, "done": asyncio.Event()}
+    jobs[job_id] = job
+    
+    cache_key = ("analyze-document", digest, analysis_type, question)
+    payload = result_cache.get(cache_key)
+    if payload is not None:
+        _finish_job(job, "completed", result={**payload, "filename": file.filename, "cache_hit": True})
+    else:
+        job["task"] = asyncio.create_task(
+            _run_analysis_job(job, cache_key, file_content, file_extension, file.filename, analysis_type, question)
+        )
+    
+    return {"job_id": job_id, "status": job["status"]}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of an analysis job, with its result once it has finished"""
+    return _job_state(_get_job(job_id))
+
+@app.websocket("/jobs/{job_id}/ws")
+async def job_updates(websocket: WebSocket, job_id: str):
+    """Send the job's current state, then its final state as soon as it finishes"""
+    await websocket.accept()
+    job = jobs.get(job_id)
+    if job is None:
+        await websocket.send_json({"job_id": job_id, "status": "not_found"})
+        await websocket.close()
+        return
+    
+    try:
+        await websocket.send_json(_job_state(job))
+        if not job["done"].is_set():
+            await job["done"].wait()
+            await websocket.send_json(_job_state(job))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+def _get_job(job_id: str) -> dict:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+def _job_state(job: dict) -> dict:
+    """Public view of a job"""
+    state = {"job_id": job["job_id"], "status": job["status"]}
+    if job["result"] is not None:
+        state["result"] = job["result"]
+    if job["error"] is not None:
+        state["error"] = job["error"]
+    return state
+
+def _finish_job(job: dict, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+    job.update(status=status, result=result, error=error)
+    job.pop("task", None)
+    job["done"].set()
+
+async def _run_analysis_job(job: dict, cache_key: tuple, file_content: bytes, file_extension: str,
+                            filename: str, analysis_type: str, question: Optional[str]):
+    """Run a queued analysis once a job slot is free"""
+    try:
+        async with job_slots:
+            job["status"] = "running"
+            payload = await _run_analysis(file_content, file_extension, filename, analysis_type, question)
+        _store_result(cache_key, payload)
+        _finish_job(job, "completed", result={**payload, "cache_hit": False})
+    except HTTPException as e:
+        _finish_job(job, "failed", error=e.detail)
+    except Exception as e:
+        logger.error(f"Error in analysis job {job['job_id']}: {str(e)}")
+        _finish_job(job, "failed", error=f"Analysis failed: {str(e)}")
+
 @app.post("/extract-clauses")
 async def extract_clauses(
     file: UploadFile = File(...),
@@ -188,38 +418,27 @@ async def extract_clauses(
     """
     try:
         # Validate and process file (similar to analyze_document)
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="No file provided")
-        
-        file_extension = Path(file.filename).suffix.lower()
-        if file_extension not in {'.pdf', '.doc', '.docx'}:
-            raise HTTPException(status_code=400, detail="Unsupported file type")
+        file_content, file_extension, digest = await _read_upload(file)
         
-        file_content = await file.read()
-        if len(file_content) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File too large")
+        cache_key = ("extract-clauses", digest, tuple(clause_types))
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
+        # Extract text and find clauses
+        extracted_text = await asyncio.to_thread(document_parser.extract_text_from_bytes, file_content, file_extension)
+        clauses = await asyncio.to_thread(compliance_checker.extract_specific_clauses, extracted_text, clause_types)
         
-        try:
-            # Extract text and find clauses
-            extracted_text = document_parser.extract_text(temp_file_path, file_extension)
-            clauses = compliance_checker.extract_specific_clauses(extracted_text, clause_types)
-            
-            return JSONResponse({
-                "success": True,
-                "filename": file.filename,
-                "extracted_clauses": clauses,
-                "clause_types_requested": clause_types,
-                "provider": "Hugging Face Transformers"
-            })
-        
-        finally:
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        return _cache_response(cache_key, {
+            "success": True,
+            "filename": file.filename,
+            "extracted_clauses": clauses,
+            "clause_types_requested": clause_types,
+            "provider": "Hugging Face Transformers"
+        })
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error extracting clauses: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Clause extraction failed: {str(e)}")
@@ -234,38 +453,29 @@ async def compliance_check(
     """
     try:
         # File validation and processing
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="No file provided")
-        
-        file_extension = Path(file.filename).suffix.lower()
-        if file_extension not in {'.pdf', '.doc', '.docx'}:
-            raise HTTPException(status_code=400, detail="Unsupported file type")
-        
-        file_content = await file.read()
-        if len(file_content) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File too large")
+        file_content, file_extension, digest = await _read_upload(file)
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
+        cache_key = ("compliance-check", digest, tuple(regulations))
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
         
-        try:
-            # Extract text and check compliance
-            extracted_text = document_parser.extract_text(temp_file_path, file_extension)
-            compliance_results = compliance_checker.check_specific_compliance(extracted_text, regulations)
-            
-            return JSONResponse({
-                "success": True,
-                "filename": file.filename,
-                "compliance_results": compliance_results,
-                "regulations_checked": regulations,
-                "provider": "Hugging Face Transformers"
-            })
+        # Extract text and check compliance
+        extracted_text = await asyncio.to_thread(document_parser.extract_text_from_bytes, file_content, file_extension)
+        compliance_results = await asyncio.to_thread(
+            compliance_checker.check_specific_compliance, extracted_text, regulations
+        )
         
-        finally:
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        return _cache_response(cache_key, {
+            "success": True,
+            "filename": file.filename,
+            "compliance_results": compliance_results.to_dict(),
+            "regulations_checked": regulations,
+            "provider": "Hugging Face Transformers"
+        })
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error checking compliance: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Compliance check failed: {str(e)}")
@@ -275,6 +485,6 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8001,
-        reload=True,
+        reload=os.getenv("DEV") == "1",
         log_level="info"
     )
\ No newline at end of file
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+One-time offline INT8 quantization of the CPU models with Intel Neural Compressor
+
+Usage:
+    python quantize_models.py --calibration-dir path/to/contracts
+
+The calibration directory should contain plain-text (.txt) contracts. The
+quantized models are written to CONTRACTIQ_INT8_DIR (default:
+~/.cache/contractiq/int8) and picked up automatically by AIProcessor when
+running on CPU.
+"""
+
+import argparse
+import logging
+import random
+import sys
+from pathlib import Path
+
+from ai_processor import INT8_MODEL_DIR, INT8_TASKS, MODEL_NAMES, model_dir_name
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Questions used to build QA calibration pairs from contract text
+CALIBRATION_QUESTIONS = [
+    "What are the payment terms?",
+    "When does this agreement terminate?",
+    "Who is liable for damages?",
+    "What information is confidential?",
+    "Which law governs this agreement?"
+]
+
+CLAUSE_LABELS = [
+    "termination clause", "payment terms", "liability clause",
+    "confidentiality clause", "intellectual property clause",
+    "dispute resolution clause", "force majeure clause"
+]
+
+class CalibrationDataloader:
+    """Minimal dataloader yielding one pre-tokenized sample per step"""
+
+    batch_size = 1
+
+    def __init__(self, inputs: list):
+        self.inputs = inputs
+
+    def __iter__(self):
+        return iter(self.inputs)
+
+    def __len__(self):
+        return len(self.inputs)
+
+def load_calibration_sentences(calibration_dir: Path, samples: int) -> list:
+    """Sample sentences from the calibration contracts"""
+    sentences = []
+    for path in sorted(calibration_dir.glob("*.txt")):
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        sentences.extend(s.strip() for s in text.split('.') if len(s.strip()) > 20)
+
+    if not sentences:
+        raise ValueError(f"No calibration text found in {calibration_dir}")
+
+    random.seed(0)
+    return random.sample(sentences, min(samples, len(sentences)))
+
+def build_calibration_inputs(task: str, tokenizer, sentences: list) -> list:
+    """Tokenize calibration samples the way the pipeline feeds the model"""
+    if task == "question-answering":
+        pairs = [(CALIBRATION_QUESTIONS[i % len(CALIBRATION_QUESTIONS)], s) for i, s in enumerate(sentences)]
+    elif task == "zero-shot-classification":
+        pairs = [(s, f"This example is {CLAUSE_LABELS[i % len(CLAUSE_LABELS)]}.") for i, s in enumerate(sentences)]
+    else:
+        pairs = [(s, None) for s in sentences]
+
+    inputs = []
+    for first, second in pairs:
+        encoded = tokenizer(first, second, truncation=True, max_length=384, return_tensors="pt")
+        inputs.append(dict(encoded))
+    return inputs
+
+def quantize(task: str, sentences: list, output_root: Path):
+    """Quantize the model of one pipeline task with post-training static quantization"""
+    from neural_compressor import PostTrainingQuantConfig, quantization
+    from neural_compressor.utils.load_huggingface import save_for_huggingface_upstream
+    from transformers import AutoModelForQuestionAnswering, AutoModelForSequenceClassification, AutoTokenizer
+
+    model_name = MODEL_NAMES[task]
+    model_class = AutoModelForQuestionAnswering if task == "question-answering" else AutoModelForSequenceClassification
+
+    logger.info(f"🔧 Quantizing {model_name} ({task})")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = model_class.from_pretrained(model_name)
+    model.eval()
+
+    calib_dataloader = CalibrationDataloader(build_calibration_inputs(task, tokenizer, sentences))
+    config = PostTrainingQuantConfig(approach="static", calibration_sampling_size=[len(calib_dataloader)])
+    q_model = quantization.fit(model, config, calib_dataloader=calib_dataloader)
+
+    output_dir = output_root / model_dir_name(model_name)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    save_for_huggingface_upstream(q_model, tokenizer, str(output_dir))
+    logger.info(f"✅ Saved INT8 model to {output_dir}")
+
+def main():
+    """Quantize every INT8-eligible model"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calibration-dir", type=Path, required=True,
+                        help="Directory of .txt contracts used for calibration")
+    parser.add_argument("--samples", type=int, default=300,
+                        help="Number of calibration samples per model")
+    parser.add_argument("--output-dir", type=Path, default=INT8_MODEL_DIR,
+                        help="Where to write the quantized models")
+    args = parser.parse_args()
+
+    try:
+        import neural_compressor  # noqa: F401
+    except ImportError:
+        logger.error("❌ Intel Neural Compressor not installed: pip install neural-compressor")
+        return 1
+
+    sentences = load_calibration_sentences(args.calibration_dir, args.samples)
+    logger.info(f"📚 Using {len(sentences)} calibration samples")
+
+    for task in INT8_TASKS:
+        quantize(task, sentences, args.output_dir)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@
 Startup script for the FastAPI backend server
 """
 
+import argparse
+import importlib.util
 import os
 import sys
 import subprocess
@@ -13,6 +15,15 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Reduce CUDA allocator fragmentation; must be set before torch is imported
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True,max_split_size_mb:128")
+
+# DEV=1 runs a single auto-reloading worker. Otherwise WEB_CONCURRENCY worker
+# processes are started; each loads its own copy of the models (~2 GB), so the
+# default stays at one.
+DEV = os.getenv("DEV") == "1"
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+
 def check_dependencies():
     """Check if required dependencies are installed"""
     try:
@@ -21,6 +32,13 @@ def check_dependencies():
         import transformers
         import torch
         logger.info("✅ All required dependencies are available")
+        
+        # Optional GPU extras: accelerate (low-memory loading) and bitsandbytes
+        # (8-bit weights with CONTRACTIQ_LOAD_8BIT=1)
+        if torch.cuda.is_available():
+            for package in ("accelerate", "bitsandbytes"):
+                if importlib.util.find_spec(package) is None:
+                    logger.info(f"ℹ️ Optional GPU package not installed: {package}")
         return True
     except ImportError as e:
         logger.error(f"❌ Missing dependency: {e}")
@@ -28,21 +46,66 @@ def check_dependencies():
         return False
 
 def check_models():
-    """Check if AI models can be loaded"""
+    """
+    Check that the AI models are in the local cache
+    
+    Only each model's config is read (from disk, never the network), so no
+    weights are loaded; the server loads them once in the background at
+    startup. Run with --verify-models for a full load test.
+    """
     try:
-        from transformers import pipeline
-        logger.info("🤖 Testing AI model loading...")
+        import torch
+        from transformers import AutoConfig
+        from ai_processor import MODEL_CACHE_DIR, MODEL_NAMES
         
-        # Test a lightweight model
-        classifier = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-        test_result = classifier("This is a test.")
-        logger.info(f"✅ AI models working correctly: {test_result}")
+        missing = []
+        for task, model_name in MODEL_NAMES.items():
+            try:
+                AutoConfig.from_pretrained(model_name, cache_dir=MODEL_CACHE_DIR, local_files_only=True)
+            except OSError:
+                missing.append(model_name)
+        
+        if missing:
+            logger.warning(f"⚠️ Models not cached yet, they will be downloaded on first load: {', '.join(missing)}")
+            logger.info("Run 'python start_backend.py --download-models' to fetch them ahead of time")
+            return False
+        
+        device = "GPU (FP16)" if torch.cuda.is_available() else "CPU"
+        logger.info(f"✅ AI models cached, they will run on {device}")
         return True
     except Exception as e:
         logger.warning(f"⚠️ AI models may not work properly: {e}")
         logger.info("The server will still start but AI features may be limited")
         return False
 
+def verify_models():
+    """Load every AI model and run a sample input through each one"""
+    try:
+        from ai_processor import WARMUP_TEXT, get_ai_processor
+        logger.info("🤖 Testing AI model loading...")
+        
+        processor = get_ai_processor()
+        processor.prewarm()
+        summary = processor.summarize_document(WARMUP_TEXT)
+        answer = processor.answer_question(WARMUP_TEXT, "When must invoices be paid?")
+        logger.info(f"✅ AI models working correctly: {summary!r} / {answer!r}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Model verification failed: {e}")
+        return False
+
+def download_models():
+    """Download all AI models into the model cache so later starts load them from disk"""
+    try:
+        from ai_processor import download_models as download_all
+        logger.info("📥 Downloading AI models...")
+        download_all()
+        logger.info("✅ AI models downloaded")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Model download failed: {e}")
+        return False
+
 def create_directories():
     """Create necessary directories"""
     directories = ["uploads", "temp", "logs"]
@@ -53,16 +116,24 @@ def create_directories():
 def start_server():
     """Start the FastAPI server"""
     logger.info("🚀 Starting FastAPI server...")
+    if not DEV and WORKERS > 1:
+        logger.warning(f"⚠️ Running {WORKERS} workers: background jobs are kept per worker, "
+                       "so /jobs status requests may reach a worker that doesn't know the job")
     
     try:
         import uvicorn
+        # uvicorn[standard] brings uvloop and httptools; "auto" uses them
+        # when available and falls back to asyncio/h11 (e.g. on Windows)
         uvicorn.run(
             "main:app",
             host="0.0.0.0",
             port=8001,
-            reload=True,
+            reload=DEV,
+            workers=1 if DEV else WORKERS,
+            loop="auto",
+            http="auto",
             log_level="info",
-            access_log=True
+            access_log=DEV
         )
     except KeyboardInterrupt:
         logger.info("🛑 Server stopped by user")
@@ -71,6 +142,18 @@ def start_server():
 
 def main():
     """Main startup function"""
+    parser = argparse.ArgumentParser(description="Contract IQ backend server")
+    parser.add_argument("--download-models", action="store_true",
+                        help="Download the AI models into the model cache and exit")
+    parser.add_argument("--verify-models", action="store_true",
+                        help="Load every AI model, run a sample input through it and exit")
+    args = parser.parse_args()
+    
+    if args.download_models:
+        sys.exit(0 if download_models() else 1)
+    if args.verify_models:
+        sys.exit(0 if verify_models() else 1)
+    
     logger.info("🔧 Contract IQ Backend Server Startup")
     logger.info("=" * 50)
     
@@ -4,11 +4,14 @@ Pre-run check script to verify the Django and frontend configurations
 before running the application.
 """
 
+import ast
 import os
+import re
 import sys
 import subprocess
 import json
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Colors for terminal output
@@ -20,10 +23,108 @@ COLORS = {
     'BOLD': '\033[1m'
 }
 
+# Files inspected by the checks; they are read in parallel up front
+SETTINGS_PATH = Path('myproject/myproject/settings.py')
+MAIN_URLS_PATH = Path('myproject/myproject/urls.py')
+API_URLS_PATH = Path('myproject/api/urls.py')
+VITE_CONFIG_PATH = Path('vite.config.ts')
+TOOLS_PATH = Path('src/components/Tools.tsx')
+PACKAGE_JSON_PATH = Path('package.json')
+PROJECT_FILES = (SETTINGS_PATH, MAIN_URLS_PATH, API_URLS_PATH, VITE_CONFIG_PATH, TOOLS_PATH, PACKAGE_JSON_PATH)
+
+_file_contents = {}
+
+def compile_patterns(patterns):
+    """Combine named patterns into one regex so a file is scanned once for all of them."""
+    return re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in patterns.items()))
+
+# Patterns for the non-Python files, compiled once
+VITE_PATTERNS = compile_patterns({
+    'proxy': r"proxy:\s*\{",
+    'api_route': r"""['"]/api['"]\s*:""",
+})
+TOOLS_PATTERNS = compile_patterns({
+    'generate_contract_fetch': r"""fetch\(\s*['"`]/api/generate-contract/""",
+    'toast_error': r"\btoast\.error\(",
+})
+
 def print_colored(text, color):
     """Print colored text to the terminal."""
     print(f"{COLORS[color]}{text}{COLORS['RESET']}")
 
+def _read_text(path):
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return None
+
+def preload_files(paths=PROJECT_FILES):
+    """Read the project files concurrently so the checks don't wait on disk one by one."""
+    with ThreadPoolExecutor() as executor:
+        _file_contents.update(zip(paths, executor.map(_read_text, paths)))
+
+def read_file(path):
+    """Contents of a project file, or None if it does not exist."""
+    if path not in _file_contents:
+        _file_contents[path] = _read_text(path)
+    return _file_contents[path]
+
+def find_patterns(content, patterns):
+    """Names of the patterns of a combined regex that occur in content."""
+    return {match.lastgroup for match in patterns.finditer(content)}
+
+def module_assignments(path):
+    """
+    Map each top-level assignment in a Python file to its value node.
+    
+    Checking the parsed module means commented-out code never counts.
+    """
+    tree = ast.parse(read_file(path), filename=str(path))
+    assignments = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    assignments[target.id] = node.value
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+            assignments[node.target.id] = node.value
+    return assignments
+
+def literal_value(node):
+    """Value of a literal expression node, or None if it is not a literal."""
+    if node is None:
+        return None
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+def url_routes(path):
+    """
+    List the (route, included module) pairs of a urls.py's urlpatterns.
+    
+    The included module is None for routes that point at a view.
+    """
+    patterns = module_assignments(path).get('urlpatterns')
+    if not isinstance(patterns, (ast.List, ast.Tuple)):
+        return []
+    
+    routes = []
+    for element in patterns.elts:
+        if not (isinstance(element, ast.Call) and element.args):
+            continue
+        route = literal_value(element.args[0])
+        if not isinstance(route, str):
+            continue
+        included = None
+        if len(element.args) > 1:
+            target = element.args[1]
+            if (isinstance(target, ast.Call) and isinstance(target.func, ast.Name)
+                    and target.func.id == 'include' and target.args):
+                included = literal_value(target.args[0])
+        routes.append((route, included))
+    return routes
+
 def check_package_installed(package_name):
     """Check if a Python package is installed."""
     spec = importlib.util.find_spec(package_name)
@@ -43,30 +144,33 @@ def check_django_settings():
         print_colored("❌ django-cors-headers is not installed. Please run 'pip install -r requirements.txt'.", "RED")
         return False
     
-    # Check if requests is installed
-    if not check_package_installed('requests'):
-        print_colored("❌ requests is not installed. Please run 'pip install -r requirements.txt'.", "RED")
+    # Check if httpx is installed
+    if not check_package_installed('httpx'):
+        print_colored("❌ httpx is not installed. Please run 'pip install -r requirements.txt'.", "RED")
         return False
     
     # Check Django settings file
-    settings_path = Path('myproject/myproject/settings.py')
-    if not settings_path.exists():
+    settings_path = SETTINGS_PATH
+    if read_file(settings_path) is None:
         print_colored(f"❌ Django settings file not found at {settings_path}", "RED")
         return False
     
-    with open(settings_path, 'r') as f:
-        settings_content = f.read()
+    try:
+        settings = module_assignments(settings_path)
+    except SyntaxError as e:
+        print_colored(f"❌ Django settings file has a syntax error: {e}", "RED")
+        return False
     
     # Check for CORS settings
-    if 'corsheaders' not in settings_content:
+    if 'corsheaders' not in (literal_value(settings.get('INSTALLED_APPS')) or ()):
         print_colored("❌ 'corsheaders' not found in INSTALLED_APPS", "RED")
         return False
     
-    if 'corsheaders.middleware.CorsMiddleware' not in settings_content:
+    if 'corsheaders.middleware.CorsMiddleware' not in (literal_value(settings.get('MIDDLEWARE')) or ()):
         print_colored("❌ 'corsheaders.middleware.CorsMiddleware' not found in MIDDLEWARE", "RED")
         return False
     
-    if 'CORS_ALLOW_ALL_ORIGINS' not in settings_content:
+    if 'CORS_ALLOW_ALL_ORIGINS' not in settings:
         print_colored("❌ CORS_ALLOW_ALL_ORIGINS setting not found", "YELLOW")
     
     print_colored("✅ Django settings look good!", "GREEN")
@@ -77,28 +181,34 @@ def check_api_urls():
     print_colored("\nChecking API URLs...", "BOLD")
     
     # Check main urls.py
-    main_urls_path = Path('myproject/myproject/urls.py')
-    if not main_urls_path.exists():
+    main_urls_path = MAIN_URLS_PATH
+    if read_file(main_urls_path) is None:
         print_colored(f"❌ Main URLs file not found at {main_urls_path}", "RED")
         return False
     
-    with open(main_urls_path, 'r') as f:
-        main_urls_content = f.read()
+    try:
+        main_routes = url_routes(main_urls_path)
+    except SyntaxError as e:
+        print_colored(f"❌ Main URLs file has a syntax error: {e}", "RED")
+        return False
     
-    if "path('api/', include('api.urls'))" not in main_urls_content:
+    if ('api/', 'api.urls') not in main_routes:
         print_colored("❌ API URLs not included in main URLs file", "RED")
         return False
     
     # Check API urls.py
-    api_urls_path = Path('myproject/api/urls.py')
-    if not api_urls_path.exists():
+    api_urls_path = API_URLS_PATH
+    if read_file(api_urls_path) is None:
         print_colored(f"❌ API URLs file not found at {api_urls_path}", "RED")
         return False
     
-    with open(api_urls_path, 'r') as f:
-        api_urls_content = f.read()
+    try:
+        api_routes = url_routes(api_urls_path)
+    except SyntaxError as e:
+        print_colored(f"❌ API URLs file has a syntax error: {e}", "RED")
+        return False
     
-    if "path('generate-contract/" not in api_urls_content:
+    if not any(route.startswith('generate-contract/') for route, _ in api_routes):
         print_colored("❌ 'generate-contract' endpoint not found in API URLs", "RED")
         return False
     
@@ -109,15 +219,14 @@ def check_vite_config():
     """Check Vite configuration for API proxy."""
     print_colored("\nChecking Vite configuration...", "BOLD")
     
-    vite_config_path = Path('vite.config.ts')
-    if not vite_config_path.exists():
+    vite_config_path = VITE_CONFIG_PATH
+    vite_config_content = read_file(vite_config_path)
+    if vite_config_content is None:
         print_colored(f"❌ Vite config file not found at {vite_config_path}", "RED")
         return False
     
-    with open(vite_config_path, 'r') as f:
-        vite_config_content = f.read()
-    
-    if "proxy: {" not in vite_config_content or "'/api'" not in vite_config_content:
+    found = find_patterns(vite_config_content, VITE_PATTERNS)
+    if not {'proxy', 'api_route'} <= found:
         print_colored("❌ API proxy configuration not found in Vite config", "RED")
         return False
     
@@ -128,19 +237,18 @@ def check_frontend_api_calls():
     """Check frontend API calls in Tools.tsx."""
     print_colored("\nChecking frontend API calls...", "BOLD")
     
-    tools_path = Path('src/components/Tools.tsx')
-    if not tools_path.exists():
+    tools_path = TOOLS_PATH
+    tools_content = read_file(tools_path)
+    if tools_content is None:
         print_colored(f"❌ Tools component not found at {tools_path}", "RED")
         return False
     
-    with open(tools_path, 'r') as f:
-        tools_content = f.read()
-    
-    if "fetch('/api/generate-contract/" not in tools_content:
+    found = find_patterns(tools_content, TOOLS_PATTERNS)
+    if 'generate_contract_fetch' not in found:
         print_colored("❌ API call to generate-contract not found in Tools.tsx", "RED")
         return False
     
-    if "toast.error(" not in tools_content:
+    if 'toast_error' not in found:
         print_colored("⚠️ Error handling with toast notifications might be missing", "YELLOW")
     
     print_colored("✅ Frontend API calls look good!", "GREEN")
@@ -150,17 +258,17 @@ def check_package_json():
     """Check package.json for required dependencies."""
     print_colored("\nChecking package.json...", "BOLD")
     
-    package_json_path = Path('package.json')
-    if not package_json_path.exists():
+    package_json_path = PACKAGE_JSON_PATH
+    package_json_content = read_file(package_json_path)
+    if package_json_content is None:
         print_colored(f"❌ package.json not found at {package_json_path}", "RED")
         return False
     
-    with open(package_json_path, 'r') as f:
-        try:
-            package_json = json.load(f)
-        except json.JSONDecodeError:
-            print_colored("❌ package.json is not valid JSON", "RED")
-            return False
+    try:
+        package_json = json.loads(package_json_content)
+    except json.JSONDecodeError:
+        print_colored("❌ package.json is not valid JSON", "RED")
+        return False
     
     dependencies = package_json.get('dependencies', {})
     
@@ -183,6 +291,8 @@ def main():
     """Run all checks and provide a summary."""
     print_colored("\n=== Pre-run Check for UI Glowup Saga ===\n", "BOLD")
     
+    preload_files()
+    
     checks = [
         ("Django Settings", check_django_settings),
         ("API URLs", check_api_urls),
@@ -208,7 +318,7 @@ def main():
         print_colored("\n✅ All checks passed! You can run the application now.", "GREEN")
         print_colored("\nTo start the Django server, run:", "BOLD")
         print("  cd myproject")
-        print("  python manage.py runserver")
+        print("  uvicorn myproject.asgi:application")
         print_colored("\nTo start the frontend, run:", "BOLD")
         print("  npm run dev")
         return 0
@@ -1,6 +1,24 @@
+import logging
+import os
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # uvicorn reads its default worker count from WEB_CONCURRENCY
+        workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+        if workers > 1 and settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+            logger.warning(
+                'Running %d workers with the local-memory cache: background jobs are '
+                'kept per worker, so /api/jobs/ status requests may reach a worker '
+                'that does not know the job, and each worker applies its own rate '
+                'limit. Set REDIS_URL to share the cache.',
+                workers
+            )
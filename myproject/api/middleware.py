@@ -0,0 +1,23 @@
+import logging
+
+from django.utils.deprecation import MiddlewareMixin
+
+from .views import json_response
+
+logger = logging.getLogger(__name__)
+
+
+class JSONErrorMiddleware(MiddlewareMixin):
+    """
+    Turn an exception escaping an API view into the JSON error body the
+    frontend expects, logging its traceback once
+    """
+
+    def process_exception(self, request, exception):
+        if not request.path.startswith('/api/'):
+            return None
+        logger.exception('Unhandled error in %s %s', request.method, request.path)
+        return json_response({
+            'success': False,
+            'error': f'Server error: {str(exception)}'
+        }, status=500)
@@ -3,6 +3,10 @@ from . import views
 
 urlpatterns = [
     path('generate-contract/', views.generate_contract, name='generate_contract'),
+    path('generate-contracts/', views.generate_contracts_bulk, name='generate_contracts_bulk'),
     path('analyze-document/', views.analyze_document, name='analyze_document'),
+    path('jobs/generate-contract/', views.submit_contract_job, name='submit_contract_job'),
+    path('jobs/analyze-document/', views.submit_analysis_job, name='submit_analysis_job'),
+    path('jobs/<str:job_id>/', views.job_status, name='job_status'),
     path('contracts/<int:contract_id>/legal_documents/', views.legal_document, name='legal_document'),
 ] 
\ No newline at end of file
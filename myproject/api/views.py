@@ -1,460 +1,1022 @@
-from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.cache import cache
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-import requests
+import asyncio
+import codecs
+import functools
+import gzip
+import hashlib
+import httpx
+import itertools
 import json
-import os
+import logging
+import time
+import uuid
+import weakref
 from datetime import datetime
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def generate_contract(request):
+logger = logging.getLogger(__name__)
+
+DEEPSEEK_API_URL = 'https://api.deepseek.com/chat/completions'
+DEEPSEEK_MODEL = 'deepseek-chat'
+# Connecting, sending the small request body and waiting for a free pooled
+# connection should all be quick; only reading a 4000-token completion can
+# take well over 30s
+DEEPSEEK_TIMEOUT = httpx.Timeout(120, connect=5, write=30, pool=5)
+
+# Authorization headers for each configured key, built once; requests take
+# them in turn so load is spread over every key's rate limit
+DEEPSEEK_AUTH_HEADERS = [{'Authorization': f'Bearer {key}'} for key in settings.DEEPSEEK_API_KEYS]
+_auth_headers = itertools.cycle(DEEPSEEK_AUTH_HEADERS)
+
+# Rate limiting and transient server errors from DeepSeek are retried with
+# exponential backoff; failed connection attempts are retried by the
+# transport itself
+DEEPSEEK_RETRIES = 2
+DEEPSEEK_RETRY_BACKOFF = 0.3
+DEEPSEEK_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# With settings.DEEPSEEK_GZIP_REQUESTS, request bodies over
+# DEEPSEEK_GZIP_MIN_BYTES are sent gzip-compressed. A compressed request
+# answered with 400 or 415 is resent uncompressed, and compression is turned
+# off after a 415, or after a 400 when the uncompressed resend succeeds.
+# Responses are negotiated by httpx, which asks for gzip and deflate, and for
+# br when brotli is installed, and decodes them transparently
+DEEPSEEK_GZIP_MIN_BYTES = 1024
+_gzip_requests = settings.DEEPSEEK_GZIP_REQUESTS
+
+# Completions are cached on their exact payload; the generation prompt
+# carries the current date, so a day is the longest an entry can be reused
+DEEPSEEK_CACHE_TIMEOUT = 60 * 60 * 24
+
+SSE_DONE = b'data: [DONE]\n\n'
+
+# Analyzed documents are split at paragraph breaks into chunks of at most
+# DOCUMENT_CHUNK_CHARS; each chunk is analyzed on its own, concurrently, and
+# the chunk analyses are then combined. Only the first DOCUMENT_MAX_CHUNKS
+# chunks' worth of a document is read. One character past the excerpt is at
+# most 4 more UTF-8 bytes, so reading this many bytes of an upload is enough
+# to fill the excerpt and tell whether it was cut
+DOCUMENT_CHUNK_CHARS = 2000
+DOCUMENT_MAX_CHUNKS = 8
+DOCUMENT_EXCERPT_CHARS = DOCUMENT_CHUNK_CHARS * DOCUMENT_MAX_CHUNKS
+DOCUMENT_EXCERPT_BYTES = (DOCUMENT_EXCERPT_CHARS + 1) * 4
+CHUNK_ANALYSIS_TOKENS = 800
+
+DOCUMENT_TYPE_LABELS = {
+    'non-disclosure': 'Non-Disclosure Agreement',
+    'employment': 'Employment Contract',
+    'service': 'Service Agreement',
+    'partnership': 'Partnership Agreement',
+    'legal-agreement': 'Legal Agreement',
+    'sale-deed': 'Sale Deed'
+}
+
+DEFAULT_REQUIREMENTS = 'Standard terms and conditions appropriate for this type of agreement.'
+
+# The fixed contract instructions live in the system message, ahead of
+# everything request-specific, so all contract requests share one prompt
+# prefix that DeepSeek serves from its context cache (in 64-token units)
+GENERATE_SYSTEM_MESSAGE = {
+    'role': 'system',
+    'content': """You are a legal document assistant that creates professional, legally-sound contracts. Format the document with proper legal structure and language.
+
+The document should be formatted as a proper legal contract with appropriate sections, clauses, and legal language.
+
+The contract should be compliant with the laws of the jurisdiction given by the user and include the date given by the user.
+
+Format the contract with proper legal headings, numbered sections, and include signature blocks at the end."""
+}
+
+ANALYZE_SYSTEM_MESSAGE = {
+    'role': 'system',
+    'content': 'You are a legal document analysis assistant that provides professional insights on legal documents.'
+}
+
+# Requests are rejected before any body parsing or DeepSeek call when they
+# are larger than these limits, or when the client IP has already made
+# RATE_LIMIT_REQUESTS DeepSeek-backed requests in the current window. The
+# counters are kept in the cache, so with the per-process local-memory cache
+# each worker counts separately (see CACHES in settings)
+MAX_JSON_BODY_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+RATE_LIMIT_REQUESTS = 10
+RATE_LIMIT_WINDOW = 60
+
+# Bulk contract generation takes at most BULK_MAX_ITEMS contracts per request
+# and has at most BULK_CONCURRENCY of them in flight at once; every item
+# counts against the client's rate limit
+BULK_MAX_ITEMS = 50
+BULK_CONCURRENCY = 16
+
+# Contracts are read through the cache, so repeated requests for one
+# contract skip the lookup
+CONTRACT_CACHE_TIMEOUT = 60 * 5
+
+# Background jobs (/jobs/...) run contract generations and document analyses
+# as tasks on the
+# worker's event loop; their state is kept in the cache for JOB_TTL seconds
+JOB_TTL = 60 * 60
+_job_tasks = set()
+
+# One pooled client per event loop: under ASGI that is one per worker, so
+# connections to DeepSeek are reused across requests. Under WSGI (runserver)
+# every async view runs in its own loop and gets a fresh client.
+_clients = weakref.WeakKeyDictionary()
+
+def get_client():
+    """Return the shared httpx.AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+            retries=DEEPSEEK_RETRIES,
+        )
+        # The client only talks to DeepSeek, so the shared header is set once
+        # here; only the rotating Authorization header is added per request
+        client = httpx.AsyncClient(
+            transport=transport,
+            timeout=DEEPSEEK_TIMEOUT,
+            headers={'Content-Type': 'application/json'},
+        )
+        _clients[loop] = client
+    return client
+
+def load_json(data):
+    """Parse a JSON request or response body, with orjson when installed."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dump_json(data):
+    """Serialize data to JSON bytes, with orjson when installed."""
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+def json_response(data, status=200):
+    """JSON HttpResponse, serialized with orjson when installed."""
+    response = HttpResponse(dump_json(data), status=status, content_type='application/json')
+    # Background jobs read the body back from here instead of parsing it
+    response.data = data
+    return response
+
+def wants_stream(request, flag=None):
+    """True when the client asked for the completion as server-sent events."""
+    if flag in (True, 'true', '1'):
+        return True
+    return 'text/event-stream' in request.headers.get('Accept', '')
+
+async def rate_limited(request, cost=1):
     """
-    Automated Contract Generation using DeepSeek API
-    This function handles requests for generating contracts
-    and interacts with the DeepSeek API for contract generation
+    Count cost DeepSeek calls against the client IP and report whether it
+    is now over RATE_LIMIT_REQUESTS for the current window.
     """
-    
-    # Get DeepSeek API key from environment variables
-    deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-    if not deepseek_api_key or deepseek_api_key == 'your_deepseek_api_key_here':
-        return JsonResponse({
+    # Fixed-window counter per client IP, shared through the cache
+    window = int(time.time() // RATE_LIMIT_WINDOW)
+    key = f'ratelimit:{request.META.get("REMOTE_ADDR", "")}:{window}'
+    if await cache.aadd(key, cost, RATE_LIMIT_WINDOW):
+        count = cost
+    else:
+        try:
+            count = await cache.aincr(key, cost)
+        except ValueError:
+            # The window expired between add and incr
+            count = cost
+    return count > RATE_LIMIT_REQUESTS
+
+def too_many_requests():
+    """429 response for a client over its DeepSeek request budget."""
+    return json_response({
+        'success': False,
+        'error': 'Too many requests. Please try again in a minute.'
+    }, status=429)
+
+def format_size(num_bytes):
+    """Size limit for error messages, in MB from 1MB up and in KB below."""
+    if num_bytes >= 1 << 20:
+        return f'{num_bytes // (1 << 20)}MB'
+    return f'{num_bytes // 1024}KB'
+
+async def reject_request(request):
+    """413 or 429 response for a request that must not reach DeepSeek, or None."""
+    multipart = bool(request.content_type) and 'multipart/form-data' in request.content_type
+    max_bytes = MAX_UPLOAD_BYTES if multipart else MAX_JSON_BODY_BYTES
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > max_bytes:
+        return json_response({
             'success': False,
-            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY in .env file.'
-        }, status=500)
+            'error': f'Request too large. Maximum size: {format_size(max_bytes)}'
+        }, status=413)
     
+    if await rate_limited(request):
+        return too_many_requests()
+    return None
+
+def text_field(data, name, default=''):
+    """
+    String field of a request body with surrounding whitespace removed, so
+    requests differing only in that whitespace share a completion cache entry.
+    Missing and non-string values give default.
+    """
+    value = data.get(name)
+    return value.strip() if isinstance(value, str) else default
+
+def parse_json_body(request):
+    """JSON object in the request body, or None if it is empty, malformed or not an object."""
+    if not request.body:
+        return None
     try:
-        # Try to parse the JSON data
+        data = load_json(request.body)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def deepseek_error_message(response):
+    """Error message of a failed DeepSeek response, parsing the body only when it is JSON."""
+    if response.headers.get('content-type', '').startswith('application/json'):
         try:
-            data = json.loads(request.body)
-        except json.JSONDecodeError:
-            return JsonResponse({
-                'success': False,
-                'error': 'Invalid JSON data in request'
-            }, status=400)
-            
-        # Get the required fields with validation
-        document_type = data.get('document_type', 'non-disclosure')
-        requirements = data.get('requirements', '')
-        jurisdiction = data.get('jurisdiction', '')
-        
-        if not jurisdiction:
-            return JsonResponse({
-                'success': False,
-                'error': 'Jurisdiction is required'
-            }, status=400)
-        
-        # Get document type label for better prompting
-        document_type_label = {
-            'non-disclosure': 'Non-Disclosure Agreement',
-            'employment': 'Employment Contract',
-            'service': 'Service Agreement',
-            'partnership': 'Partnership Agreement',
-            'legal-agreement': 'Legal Agreement',
-            'sale-deed': 'Sale Deed'
-        }.get(document_type, 'Legal Document')
-        
-        # Create a prompt for DeepSeek based on the document type and requirements
-        prompt = f"""Generate a professional {document_type_label} for the jurisdiction of {jurisdiction}.
+            error = load_json(response.content).get('error')
+        except (ValueError, AttributeError):
+            error = None
+        if isinstance(error, dict) and error.get('message'):
+            return error['message']
+    # Proxy error pages can be long HTML; the start is enough to identify them
+    return response.text[:200] or response.reason_phrase or 'Unknown error'
 
-The document should be formatted as a proper legal contract with appropriate sections, clauses, and legal language.
+def read_text_excerpt(upload):
+    """
+    Decode the start of an uploaded UTF-8 file, reading only the chunks the
+    document excerpt needs instead of the whole upload.
+    """
+    buf = bytearray()
+    for chunk in upload.chunks():
+        buf.extend(chunk)
+        if len(buf) >= DOCUMENT_EXCERPT_BYTES:
+            break
+    # The incremental decoder holds back a character split by the byte limit
+    # instead of rejecting it; any other invalid UTF-8 still raises
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    return decoder.decode(memoryview(buf)[:DOCUMENT_EXCERPT_BYTES])
 
-Specific requirements for this contract:
-{requirements if requirements else 'Standard terms and conditions appropriate for this type of agreement.'}
+def split_document(text):
+    """
+    Split a document into chunks of at most DOCUMENT_CHUNK_CHARS, breaking
+    between paragraphs where possible and inside over-long paragraphs otherwise.
+    """
+    chunks = []
+    current = ''
+    for paragraph in text.split('\n\n'):
+        if current and len(current) + 2 + len(paragraph) > DOCUMENT_CHUNK_CHARS:
+            chunks.append(current)
+            current = ''
+        if current:
+            current += '\n\n' + paragraph
+        else:
+            current = paragraph
+        while len(current) > DOCUMENT_CHUNK_CHARS:
+            chunks.append(current[:DOCUMENT_CHUNK_CHARS])
+            current = current[DOCUMENT_CHUNK_CHARS:]
+    chunks.append(current)
+    return chunks
+
+async def post_deepseek(body, stream=False):
+    """
+    Send an encoded chat completion request to DeepSeek, retrying gateway
+    errors. With stream=True the body is left unread; pass the response to
+    stream_response() or read it with aread().
+    """
+    global _gzip_requests
+    client = get_client()
+    content = body
+    if stream:
+        # Splice the flag into the encoded object instead of encoding it again
+        body = content = body[:-1] + b',"stream":true}'
+    elif _gzip_requests and len(body) > DEEPSEEK_GZIP_MIN_BYTES:
+        content = gzip.compress(body, compresslevel=6)
+    for attempt in range(DEEPSEEK_RETRIES + 1):
+        # Every attempt goes out on the next key
+        headers = next(_auth_headers)
+        if content is not body:
+            headers = {**headers, 'Content-Encoding': 'gzip'}
+        request = client.build_request('POST', DEEPSEEK_API_URL, headers=headers, content=content)
+        response = await client.send(request, stream=stream)
+        if response.status_code in (400, 415) and content is not body:
+            # Resend this one uncompressed. A 415 means DeepSeek does not take
+            # compressed bodies; a 400 may be about the payload itself, so it
+            # only counts as such when the plain resend succeeds
+            rejected_status = response.status_code
+            content = body
+            await response.aclose()
+            request = client.build_request('POST', DEEPSEEK_API_URL, headers=next(_auth_headers), content=body)
+            response = await client.send(request, stream=stream)
+            if rejected_status == 415 or response.status_code == 200:
+                _gzip_requests = False
+        if response.status_code not in DEEPSEEK_RETRY_STATUSES or attempt == DEEPSEEK_RETRIES:
+            if stream and response.status_code != 200:
+                await response.aread()
+            return response
+        await response.aclose()
+        # A rate-limited key is retried on another key straight away
+        if response.status_code != 429 or len(DEEPSEEK_AUTH_HEADERS) == 1:
+            await asyncio.sleep(DEEPSEEK_RETRY_BACKOFF * 2 ** attempt)
+
+def sse_frame(data):
+    """Encode one server-sent event whose data is a JSON object."""
+    return b'data: ' + dump_json(data) + b'\n\n'
+
+async def relay_deepseek_stream(response, cache_key):
+    """
+    Re-emit the content deltas of a streamed DeepSeek completion as SSE
+    frames, caching the full text once the stream completes.
+    """
+    parts = []
+    try:
+        async for line in response.aiter_lines():
+            if not line.startswith('data:'):
+                continue
+            chunk = line[len('data:'):].strip()
+            if chunk == '[DONE]':
+                await cache.aset(cache_key, ''.join(parts), DEEPSEEK_CACHE_TIMEOUT)
+                break
+            try:
+                choices = load_json(chunk).get('choices') or []
+            except (ValueError, AttributeError):
+                # Skip a malformed event rather than abort the response mid-stream
+                continue
+            content = choices[0].get('delta', {}).get('content') if choices else None
+            if content:
+                parts.append(content)
+                yield sse_frame({'content': content})
+    except httpx.TimeoutException:
+        yield sse_frame({'error': 'Request timeout. Please try again.'})
+    except httpx.RequestError as e:
+        yield sse_frame({'error': f'DeepSeek API connection error: {str(e)}'})
+    finally:
+        await response.aclose()
+    yield SSE_DONE
 
-The contract should be compliant with the laws of {jurisdiction} and include the current date: {datetime.now().strftime('%B %d, %Y')}.
+async def replay_completion(text):
+    """Send a cached completion as a single SSE frame."""
+    yield sse_frame({'content': text})
+    yield SSE_DONE
 
-Format the contract with proper legal headings, numbered sections, and include signature blocks at the end.
+def stream_response(events):
+    """StreamingHttpResponse sending SSE frames to the client."""
+    streaming = StreamingHttpResponse(events, content_type='text/event-stream')
+    streaming['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    streaming['X-Accel-Buffering'] = 'no'
+    return streaming
+
+@functools.lru_cache(maxsize=8)
+def payload_frame(system_content, temperature, max_tokens):
+    """
+    Encoded JSON of a chat completion payload before and after its user
+    message content, built once per system message and sampling settings.
+    """
+    # Encode a payload around a placeholder and split the bytes there;
+    # both encoders write U+0000 as the escape sequence \u0000
+    encoded = dump_json({
+        'model': DEEPSEEK_MODEL,
+        'messages': [
+            {'role': 'system', 'content': system_content},
+            {'role': 'user', 'content': '\x00'}
+        ],
+        'temperature': temperature,
+        'max_tokens': max_tokens
+    })
+    head, tail = encoded.split(b'"\\u0000"')
+    return head, tail
+
+async def complete_deepseek(system_message, prompt, temperature, max_tokens, stream=False):
+    """
+    Run a DeepSeek chat completion, serving repeated requests from the cache.
+    Returns (text, None) on success, or (None, response) when the view should
+    return response as is: an error, or the SSE stream when stream=True.
+    """
+    # Only the prompt is encoded per request. The resulting bytes are both
+    # the cache key source and the request body
+    head, tail = payload_frame(system_message['content'], temperature, max_tokens)
+    body = head + dump_json(prompt) + tail
+    
+    # Serve repeated requests from the completion cache
+    cache_key = 'deepseek:' + hashlib.sha256(body).hexdigest()
+    text = await cache.aget(cache_key)
+    if text is not None:
+        if stream:
+            return None, stream_response(replay_completion(text))
+        return text, None
+    
+    # 504 and 502: the failure is upstream, not in this server
+    try:
+        response = await post_deepseek(body, stream=stream)
+    except httpx.TimeoutException as e:
+        logger.warning('DeepSeek API timeout: %r', e)
+        return None, json_response({
+            'success': False,
+            'error': 'Request timeout. Please try again.'
+        }, status=504)
+    except httpx.RequestError as e:
+        logger.warning('DeepSeek API connection error: %r', e)
+        return None, json_response({
+            'success': False,
+            'error': f'DeepSeek API connection error: {str(e)}'
+        }, status=502)
+    
+    # Check if the response is valid
+    if response.status_code != 200:
+        error_message = deepseek_error_message(response)
+        logger.warning('DeepSeek API error %s: %s', response.status_code, error_message)
+        # 502: the failure is upstream, not in this server
+        return None, json_response({
+            'success': False,
+            'error': f'DeepSeek API error ({response.status_code}): {error_message}'
+        }, status=502)
+    
+    # Relay the completion as it is generated
+    if stream:
+        return None, stream_response(relay_deepseek_stream(response, cache_key))
+    
+    # Extract the completion text
+    try:
+        response_json = load_json(response.content)
+    except ValueError:
+        response_json = {}
+    if not isinstance(response_json, dict) or not response_json.get('choices'):
+        return None, json_response({
+            'success': False,
+            'error': 'Invalid response from DeepSeek API'
+        }, status=500)
+    
+    text = response_json['choices'][0]['message']['content']
+    await cache.aset(cache_key, text, DEEPSEEK_CACHE_TIMEOUT)
+    return text, None
+
+@functools.lru_cache(maxsize=2)
+def contract_date(day):
+    """Long-form date written into contracts, formatted once per day."""
+    return day.strftime('%B %d, %Y')
+
+def invalid_contract_request(data):
+    """400 response for a contract request missing a required field, or None."""
+    if not text_field(data, 'jurisdiction'):
+        return json_response({
+            'success': False,
+            'error': 'Jurisdiction is required'
+        }, status=400)
+    return None
+
+async def contract_response(data, stream=False):
+    """
+    Generate the contract described by a request body and build the response.
+    Shared by generate_contract and contract generation jobs.
+    """
+    
+    # Get the required fields with validation
+    document_type = text_field(data, 'document_type', 'non-disclosure')
+    requirements = text_field(data, 'requirements')
+    jurisdiction = text_field(data, 'jurisdiction')
+    
+    error_response = invalid_contract_request(data)
+    if error_response is not None:
+        return error_response
+    
+    # One timestamp for both the contract date and its URL
+    now = datetime.now()
+    
+    # Get document type label for better prompting
+    document_type_label = DOCUMENT_TYPE_LABELS.get(document_type, 'Legal Document')
+    
+    # Create a prompt for DeepSeek based on the document type and requirements;
+    # the instructions are all in the system message
+    prompt = f"""Generate a professional {document_type_label}.
+
+Jurisdiction: {jurisdiction}
+Date: {contract_date(now.date())}
+Requirements:
+{requirements or DEFAULT_REQUIREMENTS}
 """
+    
+    # Ask DeepSeek for the contract
+    contract_text, response = await complete_deepseek(
+        GENERATE_SYSTEM_MESSAGE, prompt,
+        temperature=0.7, max_tokens=4000, stream=stream
+    )
+    if response is not None:
+        return response
+    
+    # Return the contract text
+    return json_response({
+        'success': True,
+        'contract_text': contract_text,
+        'url': f'/api/contracts/{document_type}-{now.strftime("%Y%m%d%H%M%S")}.txt',
+        'document_type': document_type_label,
+        'provider': 'DeepSeek'
+    })
+
+def analysis_request(request):
+    """
+    Read the document and question from a JSON or multipart analysis request.
+    Returns ((chunks, question, stream), None), or (None, response) when the
+    request is invalid; chunks is the document excerpt from split_document().
+    """
+    # Handle both JSON and form data
+    if request.content_type and 'multipart/form-data' in request.content_type:
+        # Handle file upload
+        document_file = request.FILES.get('document')
+        question = text_field(request.POST, 'question')
+        stream = wants_stream(request, request.POST.get('stream'))
         
-        # Connect to the DeepSeek API
+        if not document_file:
+            return None, json_response({
+                'success': False,
+                'error': 'No document file provided'
+            }, status=400)
+        
+        # Uploads sent without a Content-Length are only measured here
+        if document_file.size > MAX_UPLOAD_BYTES:
+            return None, json_response({
+                'success': False,
+                'error': f'File too large. Maximum size: {format_size(MAX_UPLOAD_BYTES)}'
+            }, status=413)
+        
+        # Read file content (simplified - in production, you'd want proper file parsing)
         try:
-            headers = {
-                'Authorization': f'Bearer {deepseek_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # Create the payload for the DeepSeek API
-            payload = {
-                'model': 'deepseek-chat',  # Updated model name
-                'messages': [
-                    {
-                        'role': 'system',
-                        'content': 'You are a legal document assistant that creates professional, legally-sound contracts. Format the document with proper legal structure and language.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                'temperature': 0.7,
-                'max_tokens': 4000
-            }
-            
-            # Make the request to the DeepSeek API
-            response = requests.post(
-                'https://api.deepseek.com/chat/completions',
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            # Check if the response is valid
-            if response.status_code != 200:
-                try:
-                    error_data = response.json()
-                    error_message = error_data.get('error', {}).get('message', 'Unknown error')
-                except:
-                    error_message = f'HTTP {response.status_code}: {response.text}'
-                
-                return JsonResponse({
-                    'success': False,
-                    'error': f'DeepSeek API error: {error_message}'
-                }, status=500)
-            
-            # Parse the response from the DeepSeek API
-            response_json = response.json()
-            
-            # Extract the generated contract text
-            if 'choices' not in response_json or not response_json['choices']:
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Invalid response from DeepSeek API'
-                }, status=500)
-            
-            contract_text = response_json['choices'][0]['message']['content']
-            
-            # Return the contract text
-            return JsonResponse({
-                'success': True,
-                'contract_text': contract_text,
-                'url': f'/api/contracts/{document_type}-{datetime.now().strftime("%Y%m%d%H%M%S")}.txt',
-                'document_type': document_type_label,
-                'provider': 'DeepSeek'
-            })
-            
-        except requests.exceptions.Timeout:
-            return JsonResponse({
+            if document_file.content_type == 'text/plain':
+                document_content = read_text_excerpt(document_file).strip()
+            else:
+                # For demo purposes, we'll simulate document content
+                document_content = f"[Document content from {document_file.name} - file parsing would be implemented here]"
+        except (UnicodeDecodeError, OSError) as e:
+            return None, json_response({
                 'success': False,
-                'error': 'Request timeout. Please try again.'
-            }, status=500)
-        except requests.exceptions.RequestException as e:
-            return JsonResponse({
+                'error': f'Error reading document: {str(e)}'
+            }, status=400)
+    else:
+        # Handle JSON data
+        data = parse_json_body(request)
+        if data is None:
+            return None, json_response({
                 'success': False,
-                'error': f'DeepSeek API connection error: {str(e)}'
-            }, status=500)
+                'error': 'Invalid JSON data in request'
+            }, status=400)
         
-    except Exception as e:
-        # Handle any other errors
-        return JsonResponse({
+        document_content = text_field(data, 'document_content')
+        question = text_field(data, 'question')
+        stream = wants_stream(request, data.get('stream'))
+    
+    if not document_content and not question:
+        return None, json_response({
             'success': False,
-            'error': f'Server error: {str(e)}'
-        }, status=500)
+            'error': 'Either document content or question is required'
+        }, status=400)
+    
+    # Cut the document down to the excerpt sent to DeepSeek, marking the cut
+    chunks = split_document(document_content[:DOCUMENT_EXCERPT_CHARS])
+    if len(document_content) > DOCUMENT_EXCERPT_CHARS or len(chunks) > DOCUMENT_MAX_CHUNKS:
+        chunks = chunks[:DOCUMENT_MAX_CHUNKS]
+        chunks[-1] += '...'
+    
+    return (chunks, question, stream), None
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def analyze_document(request):
+async def analyze_chunks(chunks, question):
     """
-    AI Document Analysis using DeepSeek API
-    This function handles requests for document analysis
-    and interacts with the DeepSeek API for document analysis
+    Analyze each chunk of a document concurrently, ahead of combining them.
+    Returns (analyses, None), or (None, response) when any chunk failed.
     """
-    
-    # Get DeepSeek API key from environment variables
-    deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-    if not deepseek_api_key or deepseek_api_key == 'your_deepseek_api_key_here':
-        return JsonResponse({
-            'success': False,
-            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY in .env file.'
-        }, status=500)
-    
-    try:
-        # Handle both JSON and form data
-        if request.content_type and 'multipart/form-data' in request.content_type:
-            # Handle file upload
-            document_file = request.FILES.get('document')
-            question = request.POST.get('question', '')
-            
-            if not document_file:
-                return JsonResponse({
-                    'success': False,
-                    'error': 'No document file provided'
-                }, status=400)
-            
-            # Read file content (simplified - in production, you'd want proper file parsing)
-            try:
-                if document_file.content_type == 'text/plain':
-                    document_content = document_file.read().decode('utf-8')
-                else:
-                    # For demo purposes, we'll simulate document content
-                    document_content = f"[Document content from {document_file.name} - file parsing would be implemented here]"
-            except Exception as e:
-                return JsonResponse({
-                    'success': False,
-                    'error': f'Error reading document: {str(e)}'
-                }, status=400)
+    async def analyze(number, chunk):
+        if question:
+            prompt = f"""Analyze the following part of a longer document and note everything in it that bears on the question given after it.
+
+Document part {number} of {len(chunks)}: {chunk}
+
+Question: {question}"""
         else:
-            # Handle JSON data
-            try:
-                data = json.loads(request.body)
-            except json.JSONDecodeError:
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Invalid JSON data in request'
-                }, status=400)
-            
-            document_content = data.get('document_content', '')
-            question = data.get('question', '')
-        
-        if not document_content and not question:
-            return JsonResponse({
-                'success': False,
-                'error': 'Either document content or question is required'
-            }, status=400)
+            prompt = f"""Analyze the following part of a longer legal document and note its key terms and conditions, potential legal risks or issues, and compliance concerns.
+
+Document part {number} of {len(chunks)}: {chunk}"""
+        # Chunk analyses go through the completion cache one by one, so a
+        # document that shares parts with an earlier one reuses them
+        return await complete_deepseek(
+            ANALYZE_SYSTEM_MESSAGE, prompt,
+            temperature=0.3, max_tokens=CHUNK_ANALYSIS_TOKENS
+        )
+    
+    results = await asyncio.gather(*(analyze(number, chunk) for number, chunk in enumerate(chunks, 1)))
+    for _, response in results:
+        if response is not None:
+            return None, response
+    return [text for text, _ in results], None
+
+async def analysis_response(chunks, question, stream=False):
+    """
+    Analyze a document excerpt and build the response.
+    Shared by analyze_document and document analysis jobs.
+    """
+    # Prepare the prompt for document analysis, keeping the fixed
+    # instructions ahead of the document so they form a cacheable prefix
+    if len(chunks) > 1:
+        # Analyze the chunks, then combine their analyses; only the combining
+        # call is streamed
+        analyses, response = await analyze_chunks(chunks, question)
+        if response is not None:
+            return response
         
-        # Prepare the prompt for document analysis
+        document_content = '\n\n'.join(
+            f'Analysis of part {number}: {analysis}' for number, analysis in enumerate(analyses, 1)
+        )
         if question:
-            prompt = f"""Analyze the following document and answer this specific question: {question}
+            prompt = f"""The following are analyses of consecutive parts of one document. Combine them to answer the question given after them.
+Please provide a detailed analysis focusing on the question asked.
 
-Document content: {document_content[:2000]}...
+{document_content}
 
-Please provide a detailed analysis focusing on the question asked."""
+Question: {question}"""
         else:
-            prompt = f"""Analyze the following legal document and provide insights on:
+            prompt = f"""The following are analyses of consecutive parts of one legal document. Combine them into a single analysis of the whole document with insights on:
 1. Key terms and conditions
 2. Potential legal risks or issues
 3. Compliance with standard legal practices
 4. Suggestions for improvements
 
-Document content: {document_content[:2000]}..."""
-        
-        # Connect to the DeepSeek API
-        try:
-            headers = {
-                'Authorization': f'Bearer {deepseek_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # Create the payload for the DeepSeek API
-            payload = {
-                'model': 'deepseek-chat',
-                'messages': [
-                    {
-                        'role': 'system',
-                        'content': 'You are a legal document analysis assistant that provides professional insights on legal documents.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                'temperature': 0.3,
-                'max_tokens': 2000
-            }
-            
-            # Make the request to the DeepSeek API
-            response = requests.post(
-                'https://api.deepseek.com/chat/completions',
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            # Check if the response is valid
-            if response.status_code != 200:
-                try:
-                    error_data = response.json()
-                    error_message = error_data.get('error', {}).get('message', 'Unknown error')
-                except:
-                    error_message = f'HTTP {response.status_code}: {response.text}'
-                
-                return JsonResponse({
-                    'success': False,
-                    'error': f'DeepSeek API error: {error_message}'
-                }, status=500)
-            
-            # Parse the response from the DeepSeek API
-            response_json = response.json()
-            
-            # Extract the analysis text
-            if 'choices' not in response_json or not response_json['choices']:
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Invalid response from DeepSeek API'
-                }, status=500)
-            
-            analysis_text = response_json['choices'][0]['message']['content']
-            
-            return JsonResponse({
-                'success': True,
-                'analysis': analysis_text,
-                'provider': 'DeepSeek'
-            })
-            
-        except requests.exceptions.Timeout:
-            return JsonResponse({
-                'success': False,
-                'error': 'Request timeout. Please try again.'
-            }, status=500)
-        except requests.exceptions.RequestException as e:
-            return JsonResponse({
-                'success': False,
-                'error': f'DeepSeek API connection error: {str(e)}'
-            }, status=500)
-            
+{document_content}"""
+    elif question:
+        document_content = chunks[0]
+        prompt = f"""Analyze the following document and answer the question given after it.
+Please provide a detailed analysis focusing on the question asked.
+
+Document content: {document_content}
+
+Question: {question}"""
+    else:
+        document_content = chunks[0]
+        prompt = f"""Analyze the following legal document and provide insights on:
+1. Key terms and conditions
+2. Potential legal risks or issues
+3. Compliance with standard legal practices
+4. Suggestions for improvements
+
+Document content: {document_content}"""
+    
+    # Ask DeepSeek for the analysis
+    analysis_text, response = await complete_deepseek(
+        ANALYZE_SYSTEM_MESSAGE, prompt,
+        temperature=0.3, max_tokens=2000, stream=stream
+    )
+    if response is not None:
+        return response
+    
+    return json_response({
+        'success': True,
+        'analysis': analysis_text,
+        'provider': 'DeepSeek'
+    })
+
+async def run_job(job_id, coro):
+    """Await a view coroutine in the background and record its outcome on the job."""
+    # Nothing above a background task reports its errors, so it is done here
+    try:
+        body = (await coro).data
     except Exception as e:
-        # Handle any other errors
-        return JsonResponse({
+        logger.exception('Job %s failed', job_id)
+        body = {'success': False, 'error': f'Server error: {str(e)}'}
+    
+    if body.get('success'):
+        state = {'job_id': job_id, 'status': 'completed', 'result': body}
+    else:
+        state = {'job_id': job_id, 'status': 'failed', 'error': body.get('error')}
+    await cache.aset(f'job:{job_id}', state, JOB_TTL)
+
+async def start_job(coro):
+    """Run coro as a background job on the current event loop and return the job id."""
+    job_id = uuid.uuid4().hex
+    await cache.aset(f'job:{job_id}', {'job_id': job_id, 'status': 'running'}, JOB_TTL)
+    task = asyncio.create_task(run_job(job_id, coro))
+    # The event loop only keeps weak references to tasks
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    return job_id
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def generate_contract(request):
+    """
+    Automated Contract Generation using DeepSeek API
+    This function handles requests for generating contracts
+    and interacts with the DeepSeek API for contract generation
+    """
+    
+    # The DeepSeek API key is read once at startup
+    if not DEEPSEEK_AUTH_HEADERS:
+        return json_response({
             'success': False,
-            'error': f'Server error: {str(e)}'
+            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY (or DEEPSEEK_API_KEYS) in .env file.'
         }, status=500)
+    
+    # Turn away oversized and rate-limited requests before doing any work
+    error_response = await reject_request(request)
+    if error_response is not None:
+        return error_response
+    
+    # Parse the JSON data
+    data = parse_json_body(request)
+    if data is None:
+        return json_response({
+            'success': False,
+            'error': 'Invalid JSON data in request'
+        }, status=400)
+    
+    # Generate the contract, streaming it if the client asked for that
+    return await contract_response(data, stream=wants_stream(request, data.get('stream')))
 
 @csrf_exempt
-@require_http_methods(["GET", "POST"])
-def legal_document(request, contract_id):
+@require_http_methods(["POST"])
+async def generate_contracts_bulk(request):
     """
-    Endpoint for retrieving and analyzing legal documents for a specific contract
+    Generate several contracts in one request
+    Takes {"items": [...]}, each item being a generate-contract body, and
+    returns the generate-contract result of every item in the same order
+    """
+    
+    # The DeepSeek API key is read once at startup
+    if not DEEPSEEK_AUTH_HEADERS:
+        return json_response({
+            'success': False,
+            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY (or DEEPSEEK_API_KEYS) in .env file.'
+        }, status=500)
+    
+    # Turn away oversized and rate-limited requests before doing any work
+    error_response = await reject_request(request)
+    if error_response is not None:
+        return error_response
+    
+    # Parse the JSON data
+    data = parse_json_body(request)
+    items = data.get('items') if data is not None else None
+    if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+        return json_response({
+            'success': False,
+            'error': 'Request must have a non-empty list of contract requests in items'
+        }, status=400)
+    
+    if len(items) > BULK_MAX_ITEMS:
+        return json_response({
+            'success': False,
+            'error': f'Too many items. Maximum: {BULK_MAX_ITEMS}'
+        }, status=400)
+    
+    # reject_request() already counted this request once
+    if len(items) > 1 and await rate_limited(request, len(items) - 1):
+        return too_many_requests()
+    
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+    
+    async def generate(item):
+        async with semaphore:
+            # One failed item must not fail the rest of the batch
+            try:
+                return (await contract_response(item)).data
+            except Exception as e:
+                logger.exception('Bulk contract generation item failed')
+                return {'success': False, 'error': f'Server error: {str(e)}'}
+    
+    results = await asyncio.gather(*(generate(item) for item in items))
+    return json_response({
+        'success': True,
+        'results': results
+    })
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def analyze_document(request):
+    """
+    AI Document Analysis using DeepSeek API
+    This function handles requests for document analysis
+    and interacts with the DeepSeek API for document analysis
     """
     
-    # Get DeepSeek API key from environment variables
-    deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-    if not deepseek_api_key or deepseek_api_key == 'your_deepseek_api_key_here':
-        return JsonResponse({
+    # The DeepSeek API key is read once at startup
+    if not DEEPSEEK_AUTH_HEADERS:
+        return json_response({
             'success': False,
-            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY in .env file.'
+            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY (or DEEPSEEK_API_KEYS) in .env file.'
         }, status=500)
     
+    # Turn away oversized and rate-limited requests before doing any work
+    error_response = await reject_request(request)
+    if error_response is not None:
+        return error_response
+    
+    # Handle both JSON and form data
+    analysis, error_response = analysis_request(request)
+    if error_response is not None:
+        return error_response
+    
+    # A chunked document makes a DeepSeek call per chunk on top of the
+    # combining call already counted
+    chunks, question, stream = analysis
+    if len(chunks) > 1 and await rate_limited(request, len(chunks)):
+        return too_many_requests()
+    
+    return await analysis_response(chunks, question, stream=stream)
+
+def load_contract(contract_id):
+    """Look up a contract by id."""
     # In a real application, you would fetch the contract from a database
     # For this example, we'll simulate retrieving a contract
-    
-    # Simulate contract data
-    contract_data = {
+    return {
         'id': contract_id,
         'title': f'Contract #{contract_id}',
         'type': 'Legal Agreement',
         'content': 'This is a simulated contract content for demonstration purposes.'
     }
+
+async def get_contract(contract_id):
+    """Contract by id, from the cache when it was looked up recently."""
+    return await cache.aget_or_set(
+        f'contract:{contract_id}',
+        functools.partial(load_contract, contract_id),
+        CONTRACT_CACHE_TIMEOUT
+    )
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+async def legal_document(request, contract_id):
+    """
+    Endpoint for retrieving and analyzing legal documents for a specific contract
+    """
+    
+    # The DeepSeek API key is read once at startup
+    if not DEEPSEEK_AUTH_HEADERS:
+        return json_response({
+            'success': False,
+            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY (or DEEPSEEK_API_KEYS) in .env file.'
+        }, status=500)
     
     if request.method == 'GET':
+        contract_data = await get_contract(contract_id)
+        
         # Return the contract data
-        return JsonResponse({
+        return json_response({
             'success': True,
             'contract': contract_data
         })
     
     elif request.method == 'POST':
-        try:
-            # Try to parse the JSON data
-            try:
-                data = json.loads(request.body)
-            except json.JSONDecodeError:
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Invalid JSON data in request'
-                }, status=400)
+        # Turn away oversized and rate-limited requests before doing any work
+        error_response = await reject_request(request)
+        if error_response is not None:
+            return error_response
+        
+        # Parse the JSON data
+        data = parse_json_body(request)
+        if data is None:
+            return json_response({
+                'success': False,
+                'error': 'Invalid JSON data in request'
+            }, status=400)
+        
+        # Get the action to perform
+        action = data.get('action', '')
+        
+        if action == 'analyze':
+            contract_data = await get_contract(contract_id)
             
-            # Get the action to perform
-            action = data.get('action', '')
+            # Prepare the prompt for contract analysis
+            prompt = f"""Analyze the following legal contract (ID: {contract_id}) and provide insights on:
+            1. Key terms and conditions
+            2. Potential legal risks or issues
+            3. Compliance with standard legal practices
+            4. Suggestions for improvements
             
-            if action == 'analyze':
-                # Prepare the prompt for contract analysis
-                prompt = f"""Analyze the following legal contract (ID: {contract_id}) and provide insights on:
-                1. Key terms and conditions
-                2. Potential legal risks or issues
-                3. Compliance with standard legal practices
-                4. Suggestions for improvements
-                
-                Contract Content: {contract_data['content']}
-                """
-                
-                # Connect to the DeepSeek API
-                try:
-                    headers = {
-                        'Authorization': f'Bearer {deepseek_api_key}',
-                        'Content-Type': 'application/json'
-                    }
-                    
-                    # Create the payload for the DeepSeek API
-                    payload = {
-                        'model': 'deepseek-chat',
-                        'messages': [
-                            {
-                                'role': 'system',
-                                'content': 'You are a legal document analysis assistant that provides professional insights on legal documents.'
-                            },
-                            {
-                                'role': 'user',
-                                'content': prompt
-                            }
-                        ],
-                        'temperature': 0.3,
-                        'max_tokens': 2000
-                    }
-                    
-                    # Make the request to the DeepSeek API
-                    response = requests.post(
-                        'https://api.deepseek.com/chat/completions',
-                        headers=headers,
-                        json=payload,
-                        timeout=30
-                    )
-                    
-                    # Check if the response is valid
-                    if response.status_code != 200:
-                        try:
-                            error_data = response.json()
-                            error_message = error_data.get('error', {}).get('message', 'Unknown error')
-                        except:
-                            error_message = f'HTTP {response.status_code}: {response.text}'
-                        
-                        return JsonResponse({
-                            'success': False,
-                            'error': f'DeepSeek API error: {error_message}'
-                        }, status=500)
-                    
-                    # Parse the response from the DeepSeek API
-                    response_json = response.json()
-                    
-                    # Extract the analysis text
-                    if 'choices' not in response_json or not response_json['choices']:
-                        return JsonResponse({
-                            'success': False,
-                            'error': 'Invalid response from DeepSeek API'
-                        }, status=500)
-                    
-                    analysis_text = response_json['choices'][0]['message']['content']
-                    
-                    return JsonResponse({
-                        'success': True,
-                        'contract_id': contract_id,
-                        'analysis': analysis_text,
-                        'provider': 'DeepSeek'
-                    })
-                    
-                except requests.exceptions.Timeout:
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'Request timeout. Please try again.'
-                    }, status=500)
-                except requests.exceptions.RequestException as e:
-                    return JsonResponse({
-                        'success': False,
-                        'error': f'DeepSeek API connection error: {str(e)}'
-                    }, status=500)
-            else:
-                return JsonResponse({
-                    'success': False,
-                    'error': f'Unknown action: {action}'
-                }, status=400)
-                
-        except Exception as e:
-            # Handle any other errors
-            return JsonResponse({
+            Contract Content: {contract_data['content']}
+            """
+            
+            # Ask DeepSeek for the analysis
+            analysis_text, response = await complete_deepseek(
+                ANALYZE_SYSTEM_MESSAGE, prompt,
+                temperature=0.3, max_tokens=2000
+            )
+            if response is not None:
+                return response
+            
+            return json_response({
+                'success': True,
+                'contract_id': contract_id,
+                'analysis': analysis_text,
+                'provider': 'DeepSeek'
+            })
+        else:
+            return json_response({
                 'success': False,
-                'error': f'Server error: {str(e)}'
-            }, status=500)
\ No newline at end of file
+                'error': f'Unknown action: {action}'
+            }, status=400)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def submit_contract_job(request):
+    """
+    Queue a contract generation and return immediately with a job id
+    Takes the same JSON body as generate-contract; poll GET /api/jobs/<job_id>/
+    for the result
+    """
+    
+    # The DeepSeek API key is read once at startup
+    if not DEEPSEEK_AUTH_HEADERS:
+        return json_response({
+            'success': False,
+            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY (or DEEPSEEK_API_KEYS) in .env file.'
+        }, status=500)
+    
+    # Turn away oversized and rate-limited requests before doing any work
+    error_response = await reject_request(request)
+    if error_response is not None:
+        return error_response
+    
+    # Parse the JSON data
+    data = parse_json_body(request)
+    if data is None:
+        return json_response({
+            'success': False,
+            'error': 'Invalid JSON data in request'
+        }, status=400)
+    
+    # Reject invalid requests now rather than as failed jobs
+    error_response = invalid_contract_request(data)
+    if error_response is not None:
+        return error_response
+    
+    job_id = await start_job(contract_response(data))
+    return json_response({
+        'success': True,
+        'job_id': job_id,
+        'status': 'running',
+        'status_url': f'/api/jobs/{job_id}/'
+    }, status=202)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def submit_analysis_job(request):
+    """
+    Queue a document analysis and return immediately with a job id
+    Takes the same JSON or multipart body as analyze-document; poll
+    GET /api/jobs/<job_id>/ for the result
+    """
+    
+    # The DeepSeek API key is read once at startup
+    if not DEEPSEEK_AUTH_HEADERS:
+        return json_response({
+            'success': False,
+            'error': 'DeepSeek API key not configured. Please set DEEPSEEK_API_KEY (or DEEPSEEK_API_KEYS) in .env file.'
+        }, status=500)
+    
+    # Turn away oversized and rate-limited requests before doing any work
+    error_response = await reject_request(request)
+    if error_response is not None:
+        return error_response
+    
+    # Read the upload now: it is gone once this request has been answered
+    analysis, error_response = analysis_request(request)
+    if error_response is not None:
+        return error_response
+    
+    # A chunked document makes a DeepSeek call per chunk on top of the
+    # combining call already counted
+    chunks, question, _ = analysis
+    if len(chunks) > 1 and await rate_limited(request, len(chunks)):
+        return too_many_requests()
+    
+    job_id = await start_job(analysis_response(chunks, question))
+    return json_response({
+        'success': True,
+        'job_id': job_id,
+        'status': 'running',
+        'status_url': f'/api/jobs/{job_id}/'
+    }, status=202)
+
+@require_http_methods(["GET"])
+async def job_status(request, job_id):
+    """
+    Status of a background job, with its result once it has finished
+    """
+    state = await cache.aget(f'job:{job_id}')
+    if state is None:
+        return json_response({
+            'success': False,
+            'error': 'Job not found'
+        }, status=404)
+    
+    return json_response({'success': True, **state})
\ No newline at end of file
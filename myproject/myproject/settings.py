@@ -55,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.JSONErrorMiddleware',  # JSON 500s for errors raised in API views
 ]
 
 # CORS settings to allow frontend to make API requests
@@ -153,4 +154,39 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
\ No newline at end of file
+DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Background job state (/api/jobs/...) and the per-IP rate-limit counters
+# live in the cache. The default local-memory cache is per process, so with
+# several uvicorn workers (--workers / WEB_CONCURRENCY) a status request
+# reaching another worker gets a 404, and each worker counts its own rate
+# limit, allowing workers times RATE_LIMIT_REQUESTS per client. Set
+# REDIS_URL to share the cache between workers (needs the redis package);
+# otherwise run a single worker
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# DeepSeek API keys, read once at startup. DEEPSEEK_API_KEYS takes a
+# comma-separated list to spread requests over several keys' rate limits;
+# otherwise DEEPSEEK_API_KEY is used. The .env placeholder counts as unset
+DEEPSEEK_API_KEYS = [
+    key.strip()
+    for key in os.getenv('DEEPSEEK_API_KEYS', os.getenv('DEEPSEEK_API_KEY', '')).split(',')
+    if key.strip() and key.strip() != 'your_deepseek_api_key_here'
+]
+
+# Send large DeepSeek request bodies gzip-compressed. Off by default: the API
+# does not document accepting Content-Encoding: gzip on requests
+DEEPSEEK_GZIP_REQUESTS = os.getenv('DEEPSEEK_GZIP_REQUESTS', '').lower() in ('1', 'true', 'yes')